@@ -0,0 +1,19 @@
+"""
+Settings for local load benchmarks (`manage.py benchmark_api`).
+
+The regular settings with a SQLite database standing in for MySQL, so WSGI and
+ASGI deployments can be compared on any machine.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'bench.sqlite3',
+    }
+}
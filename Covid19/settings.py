@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -134,3 +136,76 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:8501",  # Streamlit
 ]
+
+# Number of rows per INSERT/UPDATE statement when ingesting the daily cases CSV
+INGEST_BATCH_SIZE = 500
+
+# Last downloaded CSV payloads and their ETag/Last-Modified/hash metadata
+DATA_CACHE_DIR = BASE_DIR / 'data_cache'
+
+# Seconds to trust the last check of a CSV before asking the server again
+DATA_FETCH_MAX_AGE = 60 * 60
+
+# Refresh cases and predictions from a background thread in each serving process.
+# Only one worker refreshes at a time; leave off when `manage.py refresh_data` runs from cron.
+API_BACKGROUND_REFRESH = False
+
+# Seconds between background refreshes
+API_REFRESH_INTERVAL = 6 * 60 * 60
+
+# 'forecasts' keeps 21-day forecasts keyed on the input window and model versions,
+# on disk so they survive restarts.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'forecasts': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': DATA_CACHE_DIR / 'forecasts',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Forecasts kept in each process's in-memory LRU in front of the 'forecasts' cache
+FORECAST_CACHE_SIZE = 128
+
+# Prediction intervals of the 21-day forecast: Monte Carlo paths (random RF tree and a
+# log-normally perturbed input window per path), interval coverage, the standard
+# deviation of the log perturbation, and the random seed of the paths
+FORECAST_INTERVAL_SAMPLES = 32
+FORECAST_INTERVAL_LEVEL = 0.9
+FORECAST_INTERVAL_NOISE = 0.05
+FORECAST_INTERVAL_SEED = 0
+
+# Thread budgets of model inference (see api/runtime.py). None means every core of the process.
+INFERENCE_THREADS = None
+# Threads of one batched Random Forest prediction; only one such prediction runs in parallel at a
+# time and batches smaller than RF_PARALLEL_MIN_ROWS stay on one thread
+RF_N_JOBS = None
+RF_PARALLEL_MIN_ROWS = 256
+# TensorFlow intra-op (None: INFERENCE_THREADS) and inter-op thread pools
+TF_INTRA_OP_THREADS = None
+TF_INTER_OP_THREADS = 2
+# BLAS threads used by NumPy, set through threadpoolctl
+BLAS_THREADS = 1
+
+# Cache-Control max-age (seconds) of the /predict/ and /current_cases/ responses
+API_CACHE_MAX_AGE = 5 * 60
+
+# Seconds a table version (the ETag source of the read endpoints) is cached. Ingestion starts
+# a new generation of versions right away; the timeout bounds how long other processes keep an
+# old one when the default cache is not shared between them (LocMemCache)
+API_VERSION_CACHE_TIMEOUT = 60
+
+# Largest page the series endpoints return for a single `limit` request
+API_MAX_LIMIT = 5000
+
+# Rows fetched per database round trip (and per JSON chunk) when streaming a series
+API_STREAM_CHUNK_SIZE = 2000
+
+# Largest series body (bytes) memoized in the cache; bigger ones are always streamed
+API_MEMO_MAX_BYTES = 5 * 1024 * 1024
+
+# Route the read endpoints to the async views (set when serving Covid19.asgi with uvicorn/daphne)
+API_ASYNC_VIEWS = os.environ.get('API_ASYNC_VIEWS') == '1'
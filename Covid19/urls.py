@@ -14,12 +14,33 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
-from api.views import  show_all_predictions, show_all_current_cases
+from api import views
+
+# Serve the read API with the async views under ASGI
+if settings.API_ASYNC_VIEWS:
+    show_all_predictions = views.ashow_all_predictions
+    show_all_current_cases = views.ashow_all_current_cases
+    show_combined_cases = views.ashow_combined_cases
+    show_state_summary = views.ashow_state_summary
+    show_state_predictions = views.ashow_state_predictions
+    show_summary = views.ashow_summary
+else:
+    show_all_predictions = views.show_all_predictions
+    show_all_current_cases = views.show_all_current_cases
+    show_combined_cases = views.show_combined_cases
+    show_state_summary = views.show_state_summary
+    show_state_predictions = views.show_state_predictions
+    show_summary = views.show_summary
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('predict/', show_all_predictions, name='predict_cases'),
     path('current_cases/', show_all_current_cases, name='current_cases'),
+    path('combined/', show_combined_cases, name='combined_cases'),
+    path('states/', show_state_summary, name='state_summary'),
+    path('states/predict/', show_state_predictions, name='state_predictions'),
+    path('summary/', show_summary, name='summary'),
 ]
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
@@ -6,15 +7,8 @@ class ApiConfig(AppConfig):
     name = 'api'
 
     def ready(self):
-        from api.utils import fetch_and_update_data, save_all_predictions_to_db
-        try:
-            fetch_and_update_data()
-        except Exception as e:
-            print(f"Error updating current cases data on server start: {e}")
-
-        try:
-            save_all_predictions_to_db()
-        except Exception as e:
-            print(f"Error updating predictions data on server start: {e}")
-
-
+        # Data is refreshed by `manage.py refresh_data` or, if enabled, a background
+        # thread; workers start serving straight away from the existing tables.
+        if settings.API_BACKGROUND_REFRESH:
+            from api.scheduler import start_background_refresh
+            start_background_refresh()
@@ -0,0 +1,136 @@
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .forecast_cache import model_versions
+from .models import BacktestMetric, CovidData
+from . import runtime
+from .registry import registry
+from .utils import forecast_batch, rolling_origin_windows
+
+
+def _forecast_chunk(windows, days, threads):
+    with runtime.thread_budget(threads):
+        return forecast_batch(windows, days)
+
+
+def forecast_origins(scaled_cases, origins, days, jobs=None):
+    """
+    Forecast days ahead from every origin, split into one lockstep batch per job.
+    The Random Forest and the traced LSTM release the GIL while they compute, so the
+    batches run in parallel on a thread pool without copying the models into processes.
+    The inference threads are divided between the jobs, so the Random Forest calls of
+    the jobs do not oversubscribe the cores.
+    :param jobs: Number of parallel batches, defaults to the number of inference threads.
+    :return: Array of shape (len(origins), days) with predicted cases.
+    """
+    jobs = max(1, min(jobs or runtime.inference_threads(), len(origins)))
+    windows = rolling_origin_windows(scaled_cases, origins)
+    if jobs == 1:
+        return forecast_batch(windows, days)
+
+    # Load the models once before the threads need them
+    for name in ('scaler', 'rf_model', 'lstm_infer'):
+        registry.get(name)
+
+    threads = runtime.inference_threads() // jobs
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        parts = executor.map(lambda chunk: _forecast_chunk(chunk, days, threads), np.array_split(windows, jobs))
+        return np.concatenate(list(parts))
+
+
+def forecast_errors(actual, predicted):
+    """
+    RMSE, MAE and MAPE of each forecast horizon.
+    :param actual: Array of shape (N, days) with the observed cases.
+    :param predicted: Array of the same shape with the forecasts.
+    :return: List with one {'horizon', 'rmse', 'mae', 'mape'} dictionary per day ahead.
+             MAPE skips days with zero actual cases and is None when there are none.
+    """
+    errors = predicted - actual
+    rmse = np.sqrt(np.mean(errors ** 2, axis=0))
+    mae = np.mean(np.abs(errors), axis=0)
+
+    positive = actual > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(positive, np.abs(errors) / actual, 0)
+        mape = 100 * ratios.sum(axis=0) / positive.sum(axis=0)
+
+    return [
+        {
+            'horizon': horizon + 1,
+            'rmse': float(rmse[horizon]),
+            'mae': float(mae[horizon]),
+            'mape': float(mape[horizon]) if positive[:, horizon].any() else None,
+        }
+        for horizon in range(actual.shape[1])
+    ]
+
+
+def run_backtest(start=None, end=None, days=21, step=1, jobs=None):
+    """
+    Rolling-origin evaluation of the hybrid forecast on the stored national series.
+    Every step-th date between start and end (inclusive) with 60 days of history and
+    days observed days after it is a forecast origin; all origins are forecast in lockstep
+    batches and scored against the observed cases for each horizon.
+    :param start: First origin date, defaults to the earliest possible one.
+    :param end: Last origin date, defaults to the latest one with a complete horizon.
+    :param days: Forecast horizon.
+    :param step: Days between consecutive origins.
+    :param jobs: Number of parallel batches, defaults to the number of inference threads.
+    :return: Report dictionary, or None when no date qualifies as an origin.
+    """
+    rows = list(CovidData.objects.order_by('date').values_list('date', 'cases'))
+    dates = [entry_date for entry_date, _ in rows]
+    cases = np.array([value for _, value in rows], dtype=np.float64)
+
+    origins = np.array([
+        i for i in range(60, len(dates) - days + 1, step)
+        if (start is None or dates[i] >= start) and (end is None or dates[i] <= end)
+    ], dtype=int)
+    if not len(origins):
+        return None
+
+    scaled_cases = registry.get('scaler').transform(cases)
+    predicted = forecast_origins(scaled_cases, origins, days, jobs=jobs)
+    actual = sliding_window_view(cases, days)[origins]
+
+    return {
+        'run_id': uuid.uuid4().hex,
+        'model_version': model_versions(),
+        'start_date': dates[origins[0]].isoformat(),
+        'end_date': dates[origins[-1]].isoformat(),
+        'origins': len(origins),
+        'days': days,
+        'step': step,
+        'metrics': forecast_errors(actual, predicted),
+    }
+
+
+def save_backtest(report, output=None):
+    """
+    Store the per-horizon metrics of a report in BacktestMetric and write it as JSON.
+    :param output: Report path, defaults to DATA_CACHE_DIR/backtests/backtest-<run_id>.json.
+    :return: Path of the JSON report.
+    """
+    with transaction.atomic():
+        BacktestMetric.objects.bulk_create(
+            BacktestMetric(
+                run_id=report['run_id'], model_version=report['model_version'],
+                start_date=report['start_date'], end_date=report['end_date'],
+                origins=report['origins'], **metric,
+            )
+            for metric in report['metrics']
+        )
+
+    output = Path(output or Path(settings.DATA_CACHE_DIR) / 'backtests' / f"backtest-{report['run_id']}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    return output
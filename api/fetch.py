@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import requests
+from django.conf import settings
+
+
+# status is one of 'changed', 'unchanged', 'not_modified', 'fresh' or 'failed'.
+# text is only set when status is 'changed'.
+FetchResult = namedtuple('FetchResult', ['status', 'text', 'digest', 'status_code'])
+
+
+def _cache_paths(url, cache_dir):
+    """
+    Return the payload and metadata paths used to cache the given URL.
+    """
+    cache_dir = Path(cache_dir or settings.DATA_CACHE_DIR)
+    name = url.rstrip('/').rsplit('/', 1)[-1] or 'payload'
+    return cache_dir / name, cache_dir / f"{name}.json"
+
+
+def _read_metadata(meta_path):
+    try:
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path, data, mode='w'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def fetch_csv(url, cache_dir=None, max_age=None, timeout=60):
+    """
+    Download a CSV with conditional headers, keeping the last payload on disk.
+    - Within max_age seconds of the last check, no request is made at all.
+    - The cached ETag/Last-Modified are sent as If-None-Match/If-Modified-Since, so an
+      unchanged file costs a 304 with no body.
+    - A 200 whose bytes hash to the last ingested payload is reported as unchanged.
+    :param url: URL of the CSV file.
+    :param cache_dir: Cache directory, defaults to settings.DATA_CACHE_DIR.
+    :param max_age: Seconds to trust the previous check, defaults to settings.DATA_FETCH_MAX_AGE.
+    :param timeout: Request timeout in seconds.
+    :return: FetchResult; text is only returned when the payload needs to be ingested.
+    """
+    payload_path, meta_path = _cache_paths(url, cache_dir)
+    metadata = _read_metadata(meta_path)
+    if max_age is None:
+        max_age = getattr(settings, 'DATA_FETCH_MAX_AGE', 0)
+
+    ingested = metadata.get('ingested_sha256')
+    if ingested and metadata.get('sha256') == ingested \
+            and time.time() - metadata.get('checked_at', 0) < max_age:
+        return FetchResult('fresh', None, ingested, None)
+
+    headers = {}
+    if payload_path.exists():
+        if metadata.get('etag'):
+            headers['If-None-Match'] = metadata['etag']
+        if metadata.get('last_modified'):
+            headers['If-Modified-Since'] = metadata['last_modified']
+
+    response = requests.get(url, headers=headers, timeout=timeout)
+
+    if response.status_code == 304:
+        metadata['checked_at'] = time.time()
+        _write_atomic(meta_path, json.dumps(metadata))
+        if metadata.get('sha256') == ingested:
+            return FetchResult('not_modified', None, ingested, 304)
+        # The cached payload was downloaded but never ingested successfully
+        with open(payload_path, 'r') as f:
+            return FetchResult('changed', f.read(), metadata.get('sha256'), 304)
+
+    if response.status_code != 200:
+        return FetchResult('failed', None, None, response.status_code)
+
+    content = response.content
+    digest = hashlib.sha256(content).hexdigest()
+    if digest != metadata.get('sha256') or not payload_path.exists():
+        _write_atomic(payload_path, content, mode='wb')
+
+    metadata.update({
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'sha256': digest,
+        'checked_at': time.time(),
+    })
+    _write_atomic(meta_path, json.dumps(metadata))
+
+    if digest == ingested:
+        return FetchResult('unchanged', None, digest, 200)
+    return FetchResult('changed', content.decode('utf-8'), digest, 200)
+
+
+def mark_ingested(url, digest, cache_dir=None):
+    """
+    Record that the payload with the given hash has been written to the database,
+    so the next fetch of the same bytes can skip ingestion.
+    """
+    _, meta_path = _cache_paths(url, cache_dir)
+    metadata = _read_metadata(meta_path)
+    metadata['ingested_sha256'] = digest
+    _write_atomic(meta_path, json.dumps(metadata))
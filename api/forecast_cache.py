@@ -0,0 +1,99 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+
+from .registry import MODEL_DIR
+
+
+MODEL_FILES = ('Random_Forest.pkl', 'LSTM.keras', 'scaler.pkl')
+
+
+@lru_cache(maxsize=None)
+def model_versions():
+    """
+    Content hashes of the model artifacts, computed once per process.
+    Replacing any artifact changes every forecast cache key.
+    """
+    versions = []
+    for name in MODEL_FILES:
+        with open(MODEL_DIR / name, 'rb') as f:
+            versions.append(f"{name}:{hashlib.sha256(f.read()).hexdigest()[:16]}")
+    return '|'.join(versions)
+
+
+class ForecastCache:
+    """
+    Caches recursive forecasts keyed on a hash of the scaled input window, the horizon
+    and the model versions.
+    A small in-process LRU sits in front of the 'forecasts' Django cache, which is
+    file-based by default so results survive restarts.
+    """
+
+    def __init__(self, alias='forecasts', max_entries=None):
+        self.alias = alias
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, window, days, kind=''):
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(window, dtype=np.float64).tobytes())
+        digest.update(f"|{days}|{model_versions()}".encode())
+        if kind:
+            digest.update(f"|{kind}".encode())
+        return f"forecast:{digest.hexdigest()}"
+
+    def _remember(self, key, value):
+        max_entries = self.max_entries or getattr(settings, 'FORECAST_CACHE_SIZE', 128)
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > max_entries:
+                self._memory.popitem(last=False)
+
+    def get_or_compute(self, window, days, compute, kind=''):
+        """
+        Return the cached forecast for this window and horizon, or call
+        compute(window, days=days) and store its result as (nested) lists of floats.
+        :param kind: Distinguishes forecasts of different shape computed from the same window.
+        """
+        key = self.key(window, days, kind)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return list(self._memory[key])
+
+        value = caches[self.alias].get(key)
+        hit = value is not None
+        if not hit:
+            value = np.asarray(compute(window, days=days), dtype=np.float64).tolist()
+            caches[self.alias].set(key, value, timeout=None)
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        self._remember(key, value)
+        return list(value)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'memory_entries': len(self._memory)}
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        caches[self.alias].clear()
+
+
+forecast_cache = ForecastCache()
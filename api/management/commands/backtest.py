@@ -0,0 +1,42 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.backtest import run_backtest, save_backtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Rolling-origin backtest of the hybrid forecast: forecast from every origin date in the range "
+        "and report RMSE, MAE and MAPE per horizon."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help="First origin date (YYYY-MM-DD).")
+        parser.add_argument('--end', type=date.fromisoformat, help="Last origin date (YYYY-MM-DD).")
+        parser.add_argument('--days', type=int, default=21, help="Forecast horizon in days.")
+        parser.add_argument('--step', type=int, default=1, help="Days between forecast origins.")
+        parser.add_argument('--jobs', type=int, help="Parallel batches (default: number of CPUs).")
+        parser.add_argument('--output', help="Path of the JSON report (default: DATA_CACHE_DIR/backtests/).")
+
+    def handle(self, *args, **options):
+        if options['days'] < 1 or options['step'] < 1:
+            raise CommandError("--days and --step must be positive.")
+
+        report = run_backtest(
+            start=options['start'], end=options['end'],
+            days=options['days'], step=options['step'], jobs=options['jobs'],
+        )
+        if report is None:
+            raise CommandError("No origin in the range has 60 days of history and a complete horizon.")
+
+        output = save_backtest(report, options['output'])
+
+        self.stdout.write(f"{report['origins']} origins from {report['start_date']} to {report['end_date']}")
+        for metric in report['metrics']:
+            if metric['horizon'] in (1, report['days']):
+                mape = f"{metric['mape']:.1f}%" if metric['mape'] is not None else "n/a"
+                self.stdout.write(
+                    f"day {metric['horizon']:>2}: RMSE {metric['rmse']:10.1f}  MAE {metric['mae']:10.1f}  MAPE {mape}"
+                )
+        self.stdout.write(self.style.SUCCESS(f"Run {report['run_id']} saved, report written to {output}"))
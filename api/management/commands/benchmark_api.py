@@ -0,0 +1,93 @@
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import requests
+from django.core.management.base import BaseCommand
+
+from api.models import CovidData, PredictedCases
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the read API of a running server with concurrent clients. "
+        "Run it against a WSGI and an ASGI deployment to compare throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/', help="Base URL of the server.")
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help="Endpoint to request (repeatable, default: current_cases/, predict/ and combined/).",
+        )
+        parser.add_argument('--concurrency', type=int, default=32, help="Concurrent clients.")
+        parser.add_argument('--requests', type=int, default=2000, help="Total number of requests.")
+        parser.add_argument(
+            '--seed', type=int, default=0, metavar='DAYS',
+            help="First fill empty tables with DAYS of synthetic cases and predictions (stand-in databases only).",
+        )
+
+    def _seed(self, days):
+        if CovidData.objects.exists():
+            return
+        rng = np.random.default_rng(0)
+        start = date(2020, 1, 25)
+        CovidData.objects.bulk_create(
+            CovidData(date=start + timedelta(days=i), cases=int(v))
+            for i, v in enumerate(rng.integers(0, 30000, size=days))
+        )
+        PredictedCases.objects.bulk_create(
+            PredictedCases(date=start + timedelta(days=i), predicted_cases=int(v))
+            for i, v in enumerate(rng.integers(0, 30000, size=days + 21))
+            if i >= 60
+        )
+        self.stdout.write(f"Seeded {days} days of synthetic data.")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self._seed(options['seed'])
+
+        paths = options['paths'] or ['current_cases/', 'predict/', 'combined/']
+        urls = [options['url'].rstrip('/') + '/' + path.lstrip('/') for path in paths]
+        total, concurrency = options['requests'], options['concurrency']
+
+        latencies, errors = [], []
+        counter = iter(range(total))
+        lock = threading.Lock()
+
+        def client():
+            session = requests.Session()
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                start = time.perf_counter()
+                try:
+                    response = session.get(urls[i % len(urls)], headers={'Accept-Encoding': 'gzip'}, timeout=30)
+                    ok = response.status_code == 200
+                except requests.RequestException:
+                    ok = False
+                elapsed = time.perf_counter() - start
+                with lock:
+                    (latencies if ok else errors).append(elapsed)
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+
+        if not latencies:
+            self.stderr.write(f"All {len(errors)} requests failed.")
+            return
+
+        ms = sorted(x * 1000 for x in latencies)
+        self.stdout.write(f"{len(ms)} ok, {len(errors)} failed in {wall:.1f}s "
+                          f"with {concurrency} clients: {len(ms) / wall:.0f} req/s")
+        self.stdout.write(f"latency p50 {statistics.median(ms):.1f} ms, "
+                          f"p95 {ms[int(len(ms) * 0.95) - 1]:.1f} ms, p99 {ms[int(len(ms) * 0.99) - 1]:.1f} ms")
@@ -0,0 +1,84 @@
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from api.models import CovidData
+from api.registry import registry
+from api.utils import forecast_batch, predict_with_hybrid_model, preprocess_data
+
+
+def legacy_predict_with_hybrid_model(data, days=21):
+    """
+    The original recursive forecast: Model.predict and DataFrame-wrapped scaler calls on every step.
+    Kept here only as the baseline for the benchmark.
+    """
+    scaler = registry.get('sklearn_scaler')
+    rf_model = registry.get('rf_model')
+    lstm_model = registry.get('lstm_model')
+
+    predictions = []
+    current_data = data.copy()
+    for _ in range(days):
+        rf_predictions = rf_model.predict(current_data[-60:].reshape(1, -1))
+        lstm_input = np.hstack([current_data[-30:].reshape(30, 1), np.full((30, 1), rf_predictions[0])])
+        lstm_predictions = lstm_model.predict(lstm_input.reshape(1, 30, 2), verbose=0)
+        future_cases = scaler.inverse_transform(pd.DataFrame(lstm_predictions, columns=["cases_new"])).flatten()[0]
+        future_cases = max(future_cases, 0)
+        predictions.append(future_cases)
+        new_case_scaled = scaler.transform(pd.DataFrame([[future_cases]], columns=["cases_new"]))
+        current_data = np.append(current_data[1:], new_case_scaled)
+    return predictions
+
+
+class Command(BaseCommand):
+    help = "Compare the latency of the legacy and the fast 21-day recursive forecast."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=10, help="Timed runs per implementation.")
+        parser.add_argument('--days', type=int, default=21, help="Forecast horizon.")
+        parser.add_argument(
+            '--batch', type=int, default=0, metavar='N',
+            help="Also time forecast_batch on N perturbed copies of the window, advanced in lockstep.",
+        )
+
+    def _time(self, forecast, data, days, repeat):
+        forecast(data, days=days)  # Warm-up: model loading and tracing
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = forecast(data, days=days)
+            timings.append((time.perf_counter() - start) * 1000)
+        return result, timings
+
+    def handle(self, *args, **options):
+        if CovidData.objects.count() >= 60:
+            data = preprocess_data(window_size=60)
+        else:
+            self.stdout.write("Fewer than 60 days in the database, using a random window.")
+            data = np.random.default_rng(0).random((60, 1))
+
+        days, repeat = options['days'], options['repeat']
+        legacy, legacy_ms = self._time(legacy_predict_with_hybrid_model, data, days, repeat)
+        fast, fast_ms = self._time(predict_with_hybrid_model, data, days, repeat)
+
+        for name, timings in (("legacy", legacy_ms), ("fast", fast_ms)):
+            self.stdout.write(
+                f"{name:>6}: median {statistics.median(timings):8.1f} ms, "
+                f"min {min(timings):8.1f} ms per {days}-day forecast"
+            )
+        self.stdout.write(f"speed-up: {statistics.median(legacy_ms) / statistics.median(fast_ms):.1f}x, "
+                          f"max abs difference: {np.max(np.abs(np.subtract(legacy, fast))):.4f} cases")
+
+        if options['batch']:
+            rng = np.random.default_rng(0)
+            windows = np.clip(np.asarray(data).reshape(1, -1) + rng.normal(0, 0.01, (options['batch'], 60)), 0, None)
+            _, batch_ms = self._time(lambda w, days: forecast_batch(w, days), windows, days, repeat)
+            batch = statistics.median(batch_ms)
+            self.stdout.write(
+                f"batch of {options['batch']}: median {batch:8.1f} ms "
+                f"({batch / options['batch']:.2f} ms per window, "
+                f"{statistics.median(fast_ms) * options['batch'] / batch:.1f}x faster than one window at a time)"
+            )
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.scheduler import refresh_data
+
+
+class Command(BaseCommand):
+    help = "Fetch the latest COVID-19 cases and save any missing predictions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help="Keep running and refresh every INTERVAL seconds (default: run once).",
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            if refresh_data():
+                self.stdout.write(self.style.SUCCESS("Refresh finished."))
+            if not interval:
+                break
+            time.sleep(interval)
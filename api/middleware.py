@@ -0,0 +1,59 @@
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+
+def _compress_sequence(sequence):
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT)
+    for chunk in sequence:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress responses with Brotli when the client accepts it and the brotli package is
+    installed, otherwise fall back to Django's gzip compression.
+    Streaming responses are compressed chunk by chunk.
+    """
+
+    def process_response(self, request, response):
+        if brotli is None or not re_accepts_brotli.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return super().process_response(request, response)
+
+        # Same preconditions as GZipMiddleware
+        if not response.streaming and len(response.content) < 200:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if response.streaming:
+            if response.is_async:
+                # Let gzip handle async iterators rather than buffering them here
+                return super().process_response(request, response)
+            response.streaming_content = _compress_sequence(response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, mode=brotli.MODE_TEXT, quality=5)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-17 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_rename_prediction_predictedcases'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StateSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(max_length=50, unique=True)),
+                ('total_cases', models.BigIntegerField(default=0)),
+                ('total_recovered', models.BigIntegerField(default=0)),
+                ('latest_date', models.DateField(null=True)),
+                ('latest_cases', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StateCases',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(max_length=50)),
+                ('date', models.DateField()),
+                ('cases_new', models.IntegerField()),
+                ('cases_recovered', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('state', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.16 on 2026-10-17 16:01
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def seed_running_totals(apps, schema_editor):
+    # Start the counters from the rows ingested before they existed
+    CovidData = apps.get_model('api', 'CovidData')
+    StateCases = apps.get_model('api', 'StateCases')
+    RunningTotal = apps.get_model('api', 'RunningTotal')
+    RunningTotal.objects.bulk_create([
+        RunningTotal(name='cases', value=CovidData.objects.aggregate(total=Sum('cases'))['total'] or 0),
+        RunningTotal(name='recovered', value=StateCases.objects.aggregate(total=Sum('cases_recovered'))['total'] or 0),
+        RunningTotal(name='deaths', value=0),
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_statesummary_statecases'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeathsData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('deaths', models.IntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RunningTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_running_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.16 on 2026-10-17 16:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_deathsdata_runningtotal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatePredictedCases',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(max_length=50)),
+                ('date', models.DateField()),
+                ('predicted_cases', models.IntegerField()),
+            ],
+            options={
+                'unique_together': {('state', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-17 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_statepredictedcases'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BacktestMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.CharField(db_index=True, max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('model_version', models.CharField(max_length=255)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('origins', models.IntegerField()),
+                ('horizon', models.IntegerField()),
+                ('rmse', models.FloatField()),
+                ('mae', models.FloatField()),
+                ('mape', models.FloatField(null=True)),
+            ],
+            options={
+                'unique_together': {('run_id', 'horizon')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-17 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_backtestmetric'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='predictedcases',
+            name='lower_cases',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='predictedcases',
+            name='upper_cases',
+            field=models.IntegerField(null=True),
+        ),
+    ]
@@ -8,6 +8,85 @@ class CovidData(models.Model):
 class PredictedCases(models.Model):
     date = models.DateField(unique=True)
     predicted_cases = models.IntegerField()
+    # Prediction interval of future forecasts; empty for predictions of observed dates
+    lower_cases = models.IntegerField(null=True)
+    upper_cases = models.IntegerField(null=True)
 
     def __str__(self):
         return f"{self.date}: {self.predicted_cases}"
+
+class StateCases(models.Model):
+    state = models.CharField(max_length=50)
+    date = models.DateField()
+    cases_new = models.IntegerField()
+    cases_recovered = models.IntegerField(default=0)
+
+    class Meta:
+        # Also serves as the (state, date) index
+        unique_together = ('state', 'date')
+
+    def __str__(self):
+        return f"{self.state} {self.date}: {self.cases_new}"
+
+class StateSummary(models.Model):
+    """
+    Per-state totals and latest-day snapshot, kept up to date incrementally on ingest.
+    """
+    state = models.CharField(max_length=50, unique=True)
+    total_cases = models.BigIntegerField(default=0)
+    total_recovered = models.BigIntegerField(default=0)
+    latest_date = models.DateField(null=True)
+    latest_cases = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.state}: {self.total_cases}"
+
+class StatePredictedCases(models.Model):
+    state = models.CharField(max_length=50)
+    date = models.DateField()
+    predicted_cases = models.IntegerField()
+
+    class Meta:
+        # Also serves as the (state, date) index
+        unique_together = ('state', 'date')
+
+    def __str__(self):
+        return f"{self.state} {self.date}: {self.predicted_cases}"
+
+class DeathsData(models.Model):
+    date = models.DateField(unique=True)
+    deaths = models.IntegerField()
+
+    def __str__(self):
+        return f"{self.date}: {self.deaths}"
+
+class RunningTotal(models.Model):
+    """
+    Headline counter ('cases', 'deaths' or 'recovered'), adjusted by the difference of each ingest.
+    """
+    name = models.CharField(max_length=20, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+class BacktestMetric(models.Model):
+    """
+    Accuracy of one forecast horizon in a rolling-origin backtest run (see manage.py backtest).
+    """
+    run_id = models.CharField(max_length=32, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    model_version = models.CharField(max_length=255)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    origins = models.IntegerField()
+    horizon = models.IntegerField()
+    rmse = models.FloatField()
+    mae = models.FloatField()
+    mape = models.FloatField(null=True)
+
+    class Meta:
+        unique_together = ('run_id', 'horizon')
+
+    def __str__(self):
+        return f"{self.run_id} day {self.horizon}: RMSE {self.rmse:.1f}"
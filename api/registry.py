@@ -0,0 +1,95 @@
+import threading
+import time
+from pathlib import Path
+
+import joblib
+
+from . import runtime
+from .scaling import AffineScaler
+
+
+MODEL_DIR = Path(__file__).resolve().parent / 'models'
+
+
+class ModelRegistry:
+    """
+    Loads model artifacts on first use and shares one instance of each across threads.
+    TensorFlow/Keras is only imported when the LSTM is first requested.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._locks = {}
+        self.load_timings = {}  # name -> seconds spent loading
+
+    def register(self, name, loader):
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+
+    def get(self, name):
+        try:
+            return self._models[name]
+        except KeyError:
+            pass
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name not in self._models:
+                start = time.perf_counter()
+                self._models[name] = self._loaders[name]()
+                self.load_timings[name] = time.perf_counter() - start
+                print(f"Loaded {name} in {self.load_timings[name]:.2f}s")
+        return self._models[name]
+
+    def is_loaded(self, name):
+        return name in self._models
+
+
+def _load_sklearn_scaler():
+    with open(MODEL_DIR / 'scaler.pkl', 'rb') as s:
+        return joblib.load(s)
+
+
+def _load_scaler():
+    return AffineScaler.from_sklearn(registry.get('sklearn_scaler'))
+
+
+def _load_random_forest():
+    runtime.configure()
+    with open(MODEL_DIR / 'Random_Forest.pkl', 'rb') as f:
+        return runtime.prepare_random_forest(joblib.load(f))
+
+
+def _load_lstm():
+    runtime.configure()
+    runtime.configure_tensorflow()
+    from keras.models import load_model
+
+    lstm_model = load_model(MODEL_DIR / 'LSTM.keras', compile=False)
+    lstm_model.compile(optimizer='adam', loss='mean_squared_error')
+    return lstm_model
+
+
+def _load_lstm_infer():
+    """
+    Trace the LSTM once into a tf.function for small-batch inference.
+    Calling it skips the data adapter and callback machinery of Model.predict.
+    """
+    import tensorflow as tf
+
+    lstm_model = registry.get('lstm_model')
+
+    @tf.function(input_signature=[tf.TensorSpec([None, 30, 2], tf.float32)])
+    def infer(lstm_input):
+        return lstm_model(lstm_input, training=False)
+
+    return lambda lstm_input: infer(lstm_input).numpy()
+
+
+registry = ModelRegistry()
+registry.register('sklearn_scaler', _load_sklearn_scaler)
+registry.register('scaler', _load_scaler)
+registry.register('rf_model', _load_random_forest)
+registry.register('lstm_model', _load_lstm)
+registry.register('lstm_infer', _load_lstm_infer)
@@ -0,0 +1,146 @@
+"""
+Thread budgets of the inference subsystem.
+
+The Random Forest (joblib threads), TensorFlow (intra-/inter-op pools) and the BLAS
+library behind NumPy each size their thread pools to the whole machine by default, so
+running them side by side, or from several request threads at once, oversubscribes the
+cores. The settings below bound each of them:
+
+- INFERENCE_THREADS: cores available to inference (None: every core of this process)
+- RF_N_JOBS: threads of one batched Random Forest prediction (None: INFERENCE_THREADS)
+- RF_PARALLEL_MIN_ROWS: smaller batches are predicted on one thread, where joblib's
+  overhead would outweigh the gain
+- TF_INTRA_OP_THREADS / TF_INTER_OP_THREADS: TensorFlow pools (None: INFERENCE_THREADS and 2)
+- BLAS_THREADS: BLAS threads, limited through threadpoolctl
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from joblib import Parallel, delayed, parallel_config
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+
+_configure_lock = threading.Lock()
+_configured = False
+
+# Only one parallel Random Forest prediction outside a thread_budget at a time; concurrent
+# ones run on one thread
+_parallel_slot = threading.Lock()
+_local = threading.local()
+
+
+def inference_threads():
+    threads = getattr(settings, 'INFERENCE_THREADS', None)
+    if threads:
+        return threads
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS and Windows
+        return os.cpu_count() or 1
+
+
+def rf_threads():
+    """
+    Threads for one batched Random Forest prediction in the current thread.
+    """
+    budget = getattr(_local, 'budget', None)
+    if budget is not None:
+        return budget
+    return getattr(settings, 'RF_N_JOBS', None) or inference_threads()
+
+
+@contextmanager
+def thread_budget(threads):
+    """
+    Limit Random Forest predictions made by the current thread to the given number of
+    threads, e.g. when several threads already share the cores between them.
+    """
+    previous = getattr(_local, 'budget', None)
+    _local.budget = max(1, threads)
+    try:
+        yield
+    finally:
+        _local.budget = previous
+
+
+def configure():
+    """
+    Apply the BLAS limit once per process. Called before the models are loaded.
+    """
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        threadpool_limits(limits=getattr(settings, 'BLAS_THREADS', 1), user_api='blas')
+        _configured = True
+
+
+def configure_tensorflow():
+    """
+    Size TensorFlow's thread pools. Must run before TensorFlow executes its first operation.
+    """
+    import tensorflow as tf
+
+    intra = getattr(settings, 'TF_INTRA_OP_THREADS', None) or inference_threads()
+    inter = getattr(settings, 'TF_INTER_OP_THREADS', None) or 2
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra)
+        tf.config.threading.set_inter_op_parallelism_threads(inter)
+    except RuntimeError as e:  # TensorFlow was already initialized
+        print(f"Could not configure TensorFlow threads: {e}")
+
+
+def prepare_random_forest(model):
+    """
+    Clear the pickled n_jobs so rf_predict decides the thread count of every call.
+    """
+    model.n_jobs = None
+    return model
+
+
+@contextmanager
+def _rf_parallelism(rows):
+    """
+    Configure joblib for one Random Forest prediction over the given number of rows and
+    yield its thread count. Under an explicit thread_budget the caller has already divided
+    the cores between its threads, so the prediction uses its budget directly; otherwise it
+    needs the parallel slot and runs on one thread while another prediction holds it.
+    """
+    threads = rf_threads() if rows >= getattr(settings, 'RF_PARALLEL_MIN_ROWS', 256) else 1
+    budgeted = getattr(_local, 'budget', None) is not None
+    if threads > 1 and (budgeted or _parallel_slot.acquire(blocking=False)):
+        try:
+            with parallel_config(backend='threading', n_jobs=threads):
+                yield threads
+        finally:
+            if not budgeted:
+                _parallel_slot.release()
+        return
+
+    with parallel_config(backend='threading', n_jobs=1):
+        yield 1
+
+
+def rf_predict(model, X):
+    """
+    Random Forest prediction using the thread budget of the calling thread.
+    Batches of at least RF_PARALLEL_MIN_ROWS rows run the trees on several threads, unless
+    another parallel prediction without a thread_budget already occupies the cores;
+    everything else runs on one thread.
+    """
+    with _rf_parallelism(len(X)):
+        return model.predict(X)
+
+
+def rf_tree_predictions(model, X):
+    """
+    Prediction of every tree of a Random Forest, threaded like rf_predict.
+    :return: Array of shape (n_trees, len(X)); its mean over axis 0 is model.predict(X).
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    with _rf_parallelism(len(X)):
+        per_tree = Parallel()(delayed(tree.predict)(X, check_input=False) for tree in model.estimators_)
+    return np.stack(per_tree)
@@ -0,0 +1,41 @@
+import numpy as np
+
+
+class AffineScaler:
+    """
+    NumPy replacement for a fitted MinMaxScaler or StandardScaler.
+    The fitted parameters are extracted once and applied as scaled = x * scale + offset,
+    on arrays of any shape, without building DataFrames or checking feature names.
+    """
+
+    def __init__(self, scale, offset, clip=None):
+        self.scale = scale
+        self.offset = offset
+        self.clip = clip  # (low, high) for MinMaxScaler(clip=True), else None
+
+    @classmethod
+    def from_sklearn(cls, scaler):
+        if hasattr(scaler, 'data_range_'):  # MinMaxScaler
+            scale, offset = scaler.scale_, scaler.min_
+            clip = scaler.feature_range if scaler.clip else None
+        elif hasattr(scaler, 'var_'):  # StandardScaler
+            n_features = scaler.n_features_in_
+            std = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+            mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+            scale, offset, clip = 1 / std, -mean / std, None
+        else:
+            raise TypeError(f"Unsupported scaler: {type(scaler).__name__}")
+
+        # A single feature broadcasts as a scalar over any array shape
+        if len(scale) == 1:
+            scale, offset = float(scale[0]), float(offset[0])
+        return cls(scale, offset, clip)
+
+    def transform(self, X):
+        scaled = np.asarray(X, dtype=np.float64) * self.scale + self.offset
+        if self.clip is not None:
+            scaled = np.clip(scaled, *self.clip)
+        return scaled
+
+    def inverse_transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.offset) / self.scale
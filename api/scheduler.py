@@ -0,0 +1,157 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to a process-local lock only
+    fcntl = None
+
+
+_process_lock = threading.Lock()
+_background_thread = None
+
+
+def _lock_dir():
+    path = Path(settings.DATA_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@contextmanager
+def single_flight(name='refresh'):
+    """
+    Non-blocking lock shared by every thread and worker process on this host.
+    Yields True if the lock was acquired, False if someone else holds it.
+    """
+    if not _process_lock.acquire(blocking=False):
+        yield False
+        return
+    try:
+        if fcntl is None:
+            yield True
+            return
+        with open(_lock_dir() / f"{name}.lock", 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    finally:
+        _process_lock.release()
+
+
+def refresh_data(min_interval=0):
+    """
+    Fetch the latest cases and deaths and fill in missing national and state predictions.
+    Only one refresh runs at a time across workers; a refresh that finished less than
+    min_interval seconds ago (in any worker) is not repeated.
+    :return: True if this call ran the refresh, False if it was skipped.
+    """
+    from api.utils import (
+        fetch_and_update_data, fetch_and_update_deaths_data, fetch_and_update_state_data, save_all_predictions_to_db,
+        save_state_predictions_to_db,
+    )
+
+    with single_flight() as acquired:
+        if not acquired:
+            print("Refresh already running in another worker, skipping.")
+            return False
+
+        stamp = _lock_dir() / 'refresh.stamp'
+        if min_interval and stamp.exists() and time.time() - stamp.stat().st_mtime < min_interval:
+            return False
+
+        try:
+            try:
+                fetch_and_update_data()
+            except Exception as e:
+                print(f"Error updating current cases data: {e}")
+
+            try:
+                fetch_and_update_deaths_data()
+            except Exception as e:
+                print(f"Error updating deaths data: {e}")
+
+            try:
+                fetch_and_update_state_data()
+            except Exception as e:
+                print(f"Error updating state cases data: {e}")
+
+            try:
+                save_all_predictions_to_db()
+            except Exception as e:
+                print(f"Error updating predictions data: {e}")
+
+            try:
+                save_state_predictions_to_db()
+            except Exception as e:
+                print(f"Error updating state predictions: {e}")
+        finally:
+            close_old_connections()
+
+        stamp.touch()
+        return True
+
+
+def _refresh_loop(interval):
+    while True:
+        refresh_data(min_interval=interval)
+        time.sleep(interval)
+
+
+# Programs that run Django management commands; `python -m django` runs django/__main__.py
+MANAGEMENT_PROGRAMS = {'manage.py', 'django-admin', 'django-admin.py', 'django'}
+
+# WSGI/ASGI servers that import the project's application (mod_wsgi sets argv to ['mod_wsgi'])
+SERVER_PROGRAMS = {'gunicorn', 'uwsgi', 'uvicorn', 'daphne', 'hypercorn', 'waitress-serve', 'mod_wsgi'}
+
+
+def _program_name(path):
+    path = Path(path)
+    # `python -m package` puts package/__main__.py in argv[0]
+    return path.parent.name if path.name == '__main__.py' else path.name
+
+
+def _is_serving_process(argv=None):
+    """
+    True for WSGI/ASGI server workers and the child process of runserver, False for every
+    other management command (migrate, shell, refresh_data, ...) whatever its entry point,
+    and for anything else that sets up Django (test runners, task queues, scripts).
+    """
+    argv = sys.argv if argv is None else argv
+    if not argv:
+        return False
+    program = _program_name(argv[0])
+    if program in MANAGEMENT_PROGRAMS:
+        if argv[1:2] != ['runserver']:
+            return False
+        return '--noreload' in argv or os.environ.get('RUN_MAIN') == 'true'
+    return program in SERVER_PROGRAMS
+
+
+def start_background_refresh(interval=None):
+    """
+    Start a daemon thread that refreshes the data now and then every interval seconds.
+    Does nothing outside serving processes or if the thread is already running.
+    """
+    global _background_thread
+    if _background_thread is not None or not _is_serving_process():
+        return _background_thread
+
+    interval = interval or settings.API_REFRESH_INTERVAL
+    _background_thread = threading.Thread(
+        target=_refresh_loop, args=(interval,), name='api-refresh', daemon=True
+    )
+    _background_thread.start()
+    return _background_thread
@@ -0,0 +1,719 @@
+import hashlib
+import json
+import uuid
+from collections import namedtuple
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, IntegerField, Max, Sum, Value
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+
+from .models import CovidData, PredictedCases, RunningTotal, StatePredictedCases, StateSummary
+
+
+SeriesQuery = namedtuple('SeriesQuery', ['start', 'end', 'limit', 'cursor', 'fields', 'format'])
+
+ARROW_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+
+# format -> content type of the response body
+FORMATS = {
+    'json': 'application/json',        # {key: [{field: value, ...}, ...]}
+    'columns': 'application/json',     # {key: {field: [value, ...], ...}}
+    'arrow': ARROW_CONTENT_TYPE,       # Apache Arrow IPC stream, one column per field
+}
+
+
+def _parse_date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a date in YYYY-MM-DD format.")
+
+
+def parse_series_query(params, fields, accept=''):
+    """
+    Read the optional filters of a series endpoint from the query string:
+    - start, end: inclusive date range (YYYY-MM-DD)
+    - limit: maximum number of rows, up to settings.API_MAX_LIMIT
+    - cursor: next_cursor of a previous page; only rows after that date are returned
+    - fields: comma separated subset of the value fields (the first field, usually date,
+      is always included)
+    - format: json, columns or arrow; without it, an Accept header asking for
+      Arrow selects arrow and anything else gets json
+    Raises ValueError with a message for the client on invalid input.
+    """
+    start = _parse_date(params, 'start')
+    end = _parse_date(params, 'end')
+    cursor = _parse_date(params, 'cursor')
+
+    limit = params.get('limit')
+    if limit:
+        if not limit.isdigit() or int(limit) == 0:
+            raise ValueError("'limit' must be a positive integer.")
+        limit = min(int(limit), settings.API_MAX_LIMIT)
+    else:
+        limit = None
+
+    selected = fields
+    if params.get('fields'):
+        requested = [name.strip() for name in params['fields'].split(',') if name.strip()]
+        unknown = set(requested) - set(fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. "
+                             f"Available fields: {', '.join(fields)}.")
+        selected = tuple(name for name in fields if name == fields[0] or name in requested)
+
+    response_format = params.get('format')
+    if response_format is None:
+        response_format = 'arrow' if ARROW_CONTENT_TYPE in accept else 'json'
+    elif response_format not in FORMATS:
+        raise ValueError(f"'format' must be one of: {', '.join(FORMATS)}.")
+
+    return SeriesQuery(start, end, limit, cursor, selected, response_format)
+
+
+def _filter_dates(queryset, query):
+    if query.start:
+        queryset = queryset.filter(date__gte=query.start)
+    if query.end:
+        queryset = queryset.filter(date__lte=query.end)
+    if query.cursor:
+        queryset = queryset.filter(date__gt=query.cursor)
+    return queryset
+
+
+def filter_series(queryset, query):
+    """
+    Apply a SeriesQuery to a queryset, ordered by the unique date index.
+    With a limit, one extra row is fetched to tell whether there is a next page.
+    """
+    queryset = _filter_dates(queryset, query).order_by('date').values(*query.fields)
+    if query.limit:
+        queryset = queryset[:query.limit + 1]
+    return queryset
+
+
+def series_payload(key, rows, query):
+    """
+    Build the response body for the filtered rows, adding next_cursor when paginating.
+    """
+    payload = {key: rows}
+    if query.limit:
+        has_next = len(rows) > query.limit
+        del rows[query.limit:]
+        payload['next_cursor'] = rows[-1]['date'].isoformat() if has_next else None
+    return payload
+
+
+# Fields of /predict/; the bounds are only set for future dates
+PREDICTION_FIELDS = ('date', 'predicted_cases', 'lower_cases', 'upper_cases')
+
+# Arrow type of each non-integer column
+_ARROW_TYPES = {'date': 'date32', 'latest_date': 'date32', 'state': 'string'}
+
+
+def _arrow_body(columns):
+    import pyarrow as pa
+
+    arrays = {
+        name: pa.array(values, type=getattr(pa, _ARROW_TYPES.get(name, 'int64'))())
+        for name, values in columns.items()
+    }
+    table = pa.table(arrays)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class _JsonChunker:
+    """
+    Incremental encoder of the json format, shared by iter_json and aiter_json.
+    The concatenated chunks are identical to json.dumps(series_payload(key, rows, query)).
+    """
+
+    def __init__(self, key, query):
+        self.key = key
+        self.query = query
+        self.chunk_rows = settings.API_STREAM_CHUNK_SIZE
+        self.parts = []
+        self.count = 0
+        self.last = None
+        self.done = False  # Set once the page is full; the extra row means there is a next page
+
+    def head(self):
+        return f'{{{json.dumps(self.key)}: ['.encode()
+
+    def _flush(self):
+        chunk = ((', ' if self.count > len(self.parts) else '') + ', '.join(self.parts)).encode()
+        self.parts = []
+        return chunk
+
+    def feed(self, row):
+        """
+        Add a row; returns an encoded chunk once chunk_rows rows are buffered, else None.
+        """
+        if self.query.limit and self.count == self.query.limit:
+            self.done = True
+            return None
+        self.parts.append(json.dumps(row, cls=DjangoJSONEncoder))
+        self.count, self.last = self.count + 1, row
+        return self._flush() if len(self.parts) == self.chunk_rows else None
+
+    def tail(self):
+        chunk = self._flush() if self.parts else b''
+        tail = ']'
+        if self.query.limit:
+            next_cursor = self.last['date'].isoformat() if self.done else None
+            tail += f', "next_cursor": {json.dumps(next_cursor)}'
+        return chunk + (tail + '}').encode()
+
+
+def iter_json(key, rows, query):
+    """
+    Encode rows as the json format chunk by chunk, consuming the rows lazily.
+    """
+    chunker = _JsonChunker(key, query)
+    yield chunker.head()
+    for row in rows:
+        chunk = chunker.feed(row)
+        if chunker.done:
+            break
+        if chunk:
+            yield chunk
+    yield chunker.tail()
+
+
+async def aiter_json(key, rows, query):
+    """
+    Async version of iter_json for rows from an async iterator.
+    """
+    chunker = _JsonChunker(key, query)
+    yield chunker.head()
+    async for row in rows:
+        chunk = chunker.feed(row)
+        if chunker.done:
+            break
+        if chunk:
+            yield chunk
+    yield chunker.tail()
+
+
+def encode_series(key, rows, query):
+    """
+    Encode the filtered rows in the buffered columns or arrow formats.
+    :return: (body, next_cursor); next_cursor is also sent as the X-Next-Cursor header.
+    """
+    payload = series_payload(key, rows, query)
+    next_cursor = payload.get('next_cursor')
+
+    columns = {name: [row[name] for row in payload[key]] for name in query.fields}
+    if query.format == 'arrow':
+        return _arrow_body(columns), next_cursor
+
+    payload[key] = columns
+    return json.dumps(payload, cls=DjangoJSONEncoder).encode(), next_cursor
+
+
+# Cache key of the current generation of table versions; invalidate_table_versions replaces it
+VERSION_GENERATION_KEY = 'api:version-generation'
+
+
+def invalidate_table_versions():
+    """
+    Start a new generation of cached table versions, so the next request of every endpoint
+    reads its version from the database again. Called after each ingest.
+    """
+    cache.set(VERSION_GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def _generation():
+    generation = cache.get(VERSION_GENERATION_KEY)
+    if generation is None:
+        # No generation yet (or evicted): start one; if another request won the race,
+        # the keys of this one are simply never read again
+        generation = uuid.uuid4().hex
+        cache.add(VERSION_GENERATION_KEY, generation, timeout=None)
+    return generation
+
+
+async def _ageneration():
+    generation = await cache.aget(VERSION_GENERATION_KEY)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        await cache.aadd(VERSION_GENERATION_KEY, generation, timeout=None)
+    return generation
+
+
+def _version_key(generation, name):
+    return f"api:version:{generation}:{name}"
+
+
+def cached_version(name, compute):
+    """
+    Version string `name` of the current generation, or compute() stored in the cache for
+    API_VERSION_CACHE_TIMEOUT seconds. Conditional polls within that time run no query.
+    """
+    key = _version_key(_generation(), name)
+    version = cache.get(key)
+    if version is None:
+        version = compute()
+        cache.set(key, version, timeout=settings.API_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+async def acached_version(name, compute):
+    """
+    Async version of cached_version; compute returns an awaitable.
+    """
+    key = _version_key(await _ageneration(), name)
+    version = await cache.aget(key)
+    if version is None:
+        version = await compute()
+        await cache.aset(key, version, timeout=settings.API_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def _table_aggregates(value_fields):
+    aggregates = {'latest': Max('date'), 'rows': Count('id')}
+    aggregates.update((f'total_{field}', Sum(field)) for field in value_fields)
+    return aggregates
+
+
+def _table_version_of(stats, value_fields):
+    return ':'.join(str(stats[name]) for name in ['latest', 'rows', *(f'total_{field}' for field in value_fields)])
+
+
+def _table_version_name(queryset, value_fields, scope):
+    return f"{queryset.model._meta.label}:{','.join(value_fields)}:{scope}"
+
+
+def table_version(queryset, value_fields, scope=''):
+    """
+    Version string of a time-series table (a manager or a queryset of it): latest date,
+    row count and the sum of each value field, read in one aggregate query.
+    It changes whenever rows are added or values are updated, and is cached (see cached_version).
+    :param value_fields: Name or names of the summed fields; include every value column the endpoint serves.
+    :param scope: Identifies the subset of the table a filtered queryset selects.
+    """
+    value_fields = (value_fields,) if isinstance(value_fields, str) else tuple(value_fields)
+    return cached_version(
+        _table_version_name(queryset, value_fields, scope),
+        lambda: _table_version_of(queryset.aggregate(**_table_aggregates(value_fields)), value_fields),
+    )
+
+
+async def atable_version(queryset, value_fields, scope=''):
+    value_fields = (value_fields,) if isinstance(value_fields, str) else tuple(value_fields)
+
+    async def compute():
+        return _table_version_of(await queryset.aaggregate(**_table_aggregates(value_fields)), value_fields)
+    return await acached_version(_table_version_name(queryset, value_fields, scope), compute)
+
+
+def series_etag(key, version):
+    digest = hashlib.sha1(f"{key}:{version}".encode()).hexdigest()[:20]
+    return quote_etag(f"{key}-{digest}")
+
+
+def _finalize(response, etag):
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.API_CACHE_MAX_AGE)
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def _encoded_response(encoded, query, etag):
+    body, next_cursor = encoded
+    response = HttpResponse(body, content_type=FORMATS[query.format])
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return _finalize(response, etag)
+
+
+class _BodyRecorder:
+    """
+    Collects streamed chunks for memoization, giving up past settings.API_MEMO_MAX_BYTES.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def record(self, chunk):
+        if self.parts is not None:
+            self.size += len(chunk)
+            if self.size <= settings.API_MEMO_MAX_BYTES:
+                self.parts.append(chunk)
+            else:
+                self.parts = None
+
+    def encoded(self):
+        return None if self.parts is None else (b''.join(self.parts), None)
+
+
+def _memoized_stream(cache_key, chunks):
+    """
+    Pass the chunks through and memoize the whole body once the stream completes.
+    """
+    recorder = _BodyRecorder()
+    for chunk in chunks:
+        recorder.record(chunk)
+        yield chunk
+    if recorder.encoded() is not None:
+        cache.set(cache_key, recorder.encoded(), timeout=None)
+
+
+async def _amemoized_stream(cache_key, chunks):
+    recorder = _BodyRecorder()
+    async for chunk in chunks:
+        recorder.record(chunk)
+        yield chunk
+    if recorder.encoded() is not None:
+        await cache.aset(cache_key, recorder.encoded(), timeout=None)
+
+
+def _conditional(request, key, version, query):
+    """
+    Return (etag, cache_key, 304 response or None) for a series request.
+    """
+    version = f"{version}:{query}"
+    etag = series_etag(key, version)
+    cache_key = f"api:{key}:{hashlib.sha1(version.encode()).hexdigest()}"
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified = _finalize(not_modified, etag)
+    return etag, cache_key, not_modified
+
+
+NOT_ACCEPTABLE = {'error': "Arrow responses need pyarrow on the server."}
+
+
+def _cached_response(request, key, version, query, iter_rows):
+    """
+    Conditional, memoized response for a series payload.
+    - The ETag is derived from the data version and the query, so If-None-Match gets a 304.
+    - The encoded body is memoized per version and query in the default cache, so repeated
+      polls cost only the version lookup and no serialization.
+    - Otherwise the json format is streamed from a queryset iterator, so memory use does
+      not grow with the number of rows.
+    """
+    etag, cache_key, not_modified = _conditional(request, key, version, query)
+    if not_modified is not None:
+        return not_modified
+
+    encoded = cache.get(cache_key)
+    if encoded is None and query.format == 'json':
+        chunks = _memoized_stream(cache_key, iter_json(key, iter_rows(), query))
+        return _finalize(StreamingHttpResponse(chunks, content_type=FORMATS['json']), etag)
+    if encoded is None:
+        try:
+            encoded = encode_series(key, list(iter_rows()), query)
+        except ImportError:
+            return JsonResponse(NOT_ACCEPTABLE, status=406)
+        cache.set(cache_key, encoded, timeout=None)
+
+    return _encoded_response(encoded, query, etag)
+
+
+async def _acached_response(request, key, version, query, aiter_rows):
+    """
+    Async version of _cached_response; aiter_rows returns an async iterator of rows.
+    """
+    etag, cache_key, not_modified = _conditional(request, key, version, query)
+    if not_modified is not None:
+        return not_modified
+
+    encoded = await cache.aget(cache_key)
+    if encoded is None and query.format == 'json':
+        chunks = _amemoized_stream(cache_key, aiter_json(key, aiter_rows(), query))
+        return _finalize(StreamingHttpResponse(chunks, content_type=FORMATS['json']), etag)
+    if encoded is None:
+        rows = [row async for row in aiter_rows()]
+        try:
+            encoded = encode_series(key, rows, query)
+        except ImportError:
+            return JsonResponse(NOT_ACCEPTABLE, status=406)
+        await cache.aset(cache_key, encoded, timeout=None)
+
+    return _encoded_response(encoded, query, etag)
+
+
+def _parse_request(request, fields):
+    return parse_series_query(request.GET, fields, request.headers.get('Accept', ''))
+
+
+def series_response(request, queryset, key, fields, scope='', value_fields=None):
+    """
+    Serve the rows of a time-series manager or queryset as {key: [{field: value, ...}, ...]},
+    filtered by the query string (see parse_series_query).
+    :param scope: Identifies the subset of the table a filtered queryset selects; it is part
+                  of the version so different subsets never share an ETag or memoized body.
+    :param value_fields: Fields summed into the table version, defaults to every served field but the date.
+    """
+    try:
+        query = _parse_request(request, fields)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return _cached_response(
+        request, key, f"{scope}:{table_version(queryset, value_fields or fields[1:], scope)}", query,
+        lambda: filter_series(queryset.all(), query).iterator(chunk_size=settings.API_STREAM_CHUNK_SIZE),
+    )
+
+
+async def aseries_response(request, queryset, key, fields, scope='', value_fields=None):
+    """
+    Async version of series_response using the async ORM.
+    """
+    try:
+        query = _parse_request(request, fields)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return await _acached_response(
+        request, key, f"{scope}:{await atable_version(queryset, value_fields or fields[1:], scope)}", query,
+        lambda: filter_series(queryset.all(), query).aiterator(chunk_size=settings.API_STREAM_CHUNK_SIZE),
+    )
+
+
+STATE_PREDICTION_FIELDS = ('date', 'predicted_cases')
+
+
+def _state_predictions(request):
+    """
+    Return (state, queryset) for the required 'state' parameter; raises ValueError without it.
+    """
+    state = request.GET.get('state')
+    if not state:
+        raise ValueError("'state' is required, e.g. ?state=Johor.")
+    return state, StatePredictedCases.objects.filter(state=state)
+
+
+def state_predictions_response(request):
+    """
+    Serve the stored forecast of one state as {'predictions': [{'date': ..., 'predicted_cases': ...}, ...]},
+    with the same filters as the other series endpoints.
+    """
+    try:
+        state, queryset = _state_predictions(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return series_response(request, queryset, 'predictions', STATE_PREDICTION_FIELDS, scope=state)
+
+
+async def astate_predictions_response(request):
+    """
+    Async version of state_predictions_response.
+    """
+    try:
+        state, queryset = _state_predictions(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return await aseries_response(request, queryset, 'predictions', STATE_PREDICTION_FIELDS, scope=state)
+
+
+COMBINED_FIELDS = ('date', 'actual', 'predicted')
+
+
+def _combined_queryset(query):
+    """
+    Actual and predicted cases as one UNION ALL query ordered by date.
+    A date present in only one of the tables gets None for the other value.
+    """
+    # Every column is an annotation so both sides of the UNION select them in the same order.
+    # values() rather than values_list(): Django 4.2's ValuesListIterable runs its query
+    # eagerly, which breaks aiterator() in async views.
+    empty = Value(None, output_field=IntegerField())
+    actual = _filter_dates(CovidData.objects.all(), query).annotate(
+        day=F('date'), actual=F('cases'), predicted=empty,
+    ).values('day', 'actual', 'predicted')
+    predicted = _filter_dates(PredictedCases.objects.all(), query).annotate(
+        day=F('date'), actual=empty, predicted=F('predicted_cases'),
+    ).values('day', 'actual', 'predicted')
+
+    combined = actual.union(predicted, all=True).order_by('day')
+    if query.limit:
+        # At most two rows per date
+        combined = combined[:2 * (query.limit + 1)]
+    return combined
+
+
+class _CombinedFolder:
+    """
+    Folds the date-ordered UNION rows into one {date, actual, predicted} row per date.
+    """
+
+    def __init__(self, query):
+        self.fields = query.fields
+        self.row = None
+
+    def push(self, values):
+        """
+        Add a UNION row; returns the previous date's row once a new date starts, else None.
+        """
+        if self.row is not None and self.row['date'] == values['day']:
+            if values['actual'] is not None:
+                self.row['actual'] = values['actual']
+            if values['predicted'] is not None:
+                self.row['predicted'] = values['predicted']
+            return None
+        finished = self.flush()
+        self.row = {'date': values['day'], 'actual': values['actual'], 'predicted': values['predicted']}
+        return finished
+
+    def flush(self):
+        if self.row is None:
+            return None
+        return {name: self.row[name] for name in self.fields}
+
+
+def combined_rows(query):
+    """
+    Yield actual and predicted cases aligned on date, read with a single UNION ALL query.
+    """
+    folder = _CombinedFolder(query)
+    for values in _combined_queryset(query).iterator(chunk_size=settings.API_STREAM_CHUNK_SIZE):
+        row = folder.push(values)
+        if row is not None:
+            yield row
+    row = folder.flush()
+    if row is not None:
+        yield row
+
+
+async def acombined_rows(query):
+    folder = _CombinedFolder(query)
+    async for values in _combined_queryset(query).aiterator(chunk_size=settings.API_STREAM_CHUNK_SIZE):
+        row = folder.push(values)
+        if row is not None:
+            yield row
+    row = folder.flush()
+    if row is not None:
+        yield row
+
+
+def combined_response(request):
+    """
+    Serve actual and predicted cases aligned on date as
+    {'combined': [{'date': ..., 'actual': ..., 'predicted': ...}, ...]},
+    with the same filters as the other series endpoints.
+    """
+    try:
+        query = _parse_request(request, COMBINED_FIELDS)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    version = f"{table_version(CovidData.objects, 'cases')}/{table_version(PredictedCases.objects, 'predicted_cases')}"
+    return _cached_response(request, 'combined', version, query, lambda: combined_rows(query))
+
+
+async def acombined_response(request):
+    """
+    Async version of combined_response using the async ORM.
+    """
+    try:
+        query = _parse_request(request, COMBINED_FIELDS)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    version = (f"{await atable_version(CovidData.objects, 'cases')}/"
+               f"{await atable_version(PredictedCases.objects, 'predicted_cases')}")
+    return await _acached_response(request, 'combined', version, query, lambda: acombined_rows(query))
+
+
+STATE_FIELDS = ('state', 'total_cases', 'total_recovered', 'latest_date', 'latest_cases')
+
+
+def _state_query(request):
+    # One row per state: only fields and format apply
+    return _parse_request(request, STATE_FIELDS)._replace(start=None, end=None, limit=None, cursor=None)
+
+
+def _state_rows(query):
+    return StateSummary.objects.order_by('state').values(*query.fields)
+
+
+_STATE_AGGREGATES = {
+    'latest': Max('latest_date'), 'rows': Count('id'),
+    'total': Sum('total_cases'), 'recovered': Sum('total_recovered'),
+}
+
+
+def _state_version_of(stats):
+    return f"{stats['latest']}:{stats['rows']}:{stats['total']}:{stats['recovered']}"
+
+
+def state_response(request):
+    """
+    Serve the precomputed per-state totals and latest-day snapshot as
+    {'states': [{'state': ..., 'total_cases': ..., ...}, ...]}, ordered by state.
+    Supports the fields and format parameters of the series endpoints.
+    """
+    try:
+        query = _state_query(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    version = cached_version(
+        'states', lambda: _state_version_of(StateSummary.objects.aggregate(**_STATE_AGGREGATES)),
+    )
+    return _cached_response(request, 'states', version, query, lambda: _state_rows(query).iterator())
+
+
+async def astate_response(request):
+    """
+    Async version of state_response using the async ORM.
+    """
+    try:
+        query = _state_query(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    async def compute():
+        return _state_version_of(await StateSummary.objects.aaggregate(**_STATE_AGGREGATES))
+
+    version = await acached_version('states', compute)
+    return await _acached_response(request, 'states', version, query, lambda: _state_rows(query).aiterator())
+
+
+# Running total name -> field of the /summary/ payload
+SUMMARY_FIELDS = {'cases': 'total_cases', 'deaths': 'total_deaths', 'recovered': 'total_recovered'}
+
+
+def _summary(totals):
+    return {field: totals.get(name, 0) for name, field in SUMMARY_FIELDS.items()}
+
+
+def _summary_response(request, summary):
+    etag = series_etag('summary', json.dumps(summary, sort_keys=True))
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return _finalize(not_modified, etag)
+    return _finalize(JsonResponse({'summary': summary}), etag)
+
+
+def summary_response(request):
+    """
+    Serve the headline totals as {'summary': {'total_cases': ..., 'total_deaths': ..., 'total_recovered': ...}}.
+    The totals are running counters maintained on ingest, so this is a single small query.
+    """
+    totals = dict(RunningTotal.objects.filter(name__in=SUMMARY_FIELDS).values_list('name', 'value'))
+    return _summary_response(request, _summary(totals))
+
+
+async def asummary_response(request):
+    """
+    Async version of summary_response using the async ORM.
+    """
+    totals = {
+        total.name: total.value
+        async for total in RunningTotal.objects.filter(name__in=SUMMARY_FIELDS)
+    }
+    return _summary_response(request, _summary(totals))
@@ -1,3 +1,822 @@
-from django.test import TestCase
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from api.models import (
+    BacktestMetric, CovidData, PredictedCases, RunningTotal, StateCases, StatePredictedCases, StateSummary,
+)
+from api.series import invalidate_table_versions
+
+
+def read_body(response):
+    """
+    Body of a regular or streaming response.
+    """
+    return b''.join(response.streaming_content) if response.streaming else response.content
+
+
+def read_json(response):
+    return json.loads(read_body(response))
+
+
+def create_cases(days, start=date(2021, 1, 1), seed=0):
+    """
+    Insert a synthetic daily series into CovidData and return the case counts.
+    """
+    rng = np.random.default_rng(seed)
+    cases = rng.integers(0, 30000, size=days)
+    CovidData.objects.bulk_create(
+        CovidData(date=start + timedelta(days=i), cases=int(value))
+        for i, value in enumerate(cases)
+    )
+    return cases
+
+
+FORECAST_TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'forecasts': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'forecast-tests'},
+}
+
+
+class PredictExistingDatesTests(TestCase):
+    def test_batched_backtest_matches_per_date_loop(self):
+        from api import utils
+        from api.registry import registry
+
+        create_cases(75)
+        predictions = utils.predict_cases_for_existing_dates()
+
+        scaled_cases = utils.preprocess_data(window_size=75)
+        dates = sorted(CovidData.objects.values_list('date', flat=True))
+        self.assertEqual(list(predictions), dates[60:])
+
+        for i in range(60, 75):
+            rf_prediction = registry.get('rf_model').predict(scaled_cases[i-60:i].reshape(1, -1))
+            lstm_input = np.hstack([scaled_cases[i-30:i].reshape(30, 1), np.full((30, 1), rf_prediction[0])])
+            lstm_prediction = registry.get('lstm_model').predict(lstm_input.reshape(1, 30, 2), verbose=0)
+            expected = max(registry.get('scaler').inverse_transform(lstm_prediction).flatten()[0], 0)
+            self.assertAlmostEqual(predictions[dates[i]], expected, delta=0.5)
+
+    def test_short_history_returns_no_predictions(self):
+        from api import utils
+
+        create_cases(60)
+        self.assertEqual(utils.predict_cases_for_existing_dates(), {})
+
+    def test_incremental_prediction_matches_full_backtest(self):
+        from api import utils
+
+        create_cases(80)
+        dates = sorted(CovidData.objects.values_list('date', flat=True))
+        full = utils.predict_cases_for_existing_dates()
+
+        targets = {dates[10], dates[65], dates[79]}
+        predictions = utils.predict_cases_for_dates(targets)
+
+        self.assertEqual(set(predictions), {dates[65], dates[79]})
+        for target, predicted in predictions.items():
+            self.assertAlmostEqual(predicted, full[target], delta=0.5)
+
+    @override_settings(CACHES=FORECAST_TEST_CACHES)
+    def test_future_predictions_are_saved_with_intervals(self):
+        from api.utils import save_all_predictions_to_db
+
+        create_cases(62)
+        save_all_predictions_to_db()
+
+        future = PredictedCases.objects.filter(date__gte=date(2021, 3, 4)).order_by('date')
+        self.assertEqual(future.count(), 21)
+        for prediction in future:
+            self.assertLessEqual(prediction.lower_cases, prediction.predicted_cases)
+            self.assertGreaterEqual(prediction.upper_cases, prediction.predicted_cases)
+        self.assertFalse(PredictedCases.objects.filter(date__lt=date(2021, 3, 4), lower_cases__isnull=False).exists())
+
+    @override_settings(CACHES=FORECAST_TEST_CACHES)
+    def test_observed_dates_lose_their_interval_bounds(self):
+        from api.utils import save_all_predictions_to_db
+
+        create_cases(62)
+        save_all_predictions_to_db()
+        create_cases(2, start=date(2021, 3, 4), seed=1)
+        save_all_predictions_to_db()
+
+        observed = PredictedCases.objects.filter(date__lte=date(2021, 3, 5))
+        self.assertTrue(observed.filter(date=date(2021, 3, 5)).exists())
+        self.assertFalse(observed.filter(lower_cases__isnull=False).exists())
+        self.assertFalse(observed.filter(upper_cases__isnull=False).exists())
+        self.assertEqual(PredictedCases.objects.filter(date__gt=date(2021, 3, 5), lower_cases__isnull=False).count(), 21)
+
+    @override_settings(CACHES=FORECAST_TEST_CACHES)
+    def test_changed_interval_settings_recompute_the_forecast(self):
+        from api import utils
+
+        create_cases(62)
+        utils.forecast_cache.clear()
+        future = PredictedCases.objects.filter(date__gte=date(2021, 3, 4))
+
+        with mock.patch('api.utils.predict_with_intervals', wraps=utils.predict_with_intervals) as predict:
+            utils.save_all_predictions_to_db()
+            future.delete()
+            utils.save_all_predictions_to_db()
+            self.assertEqual(predict.call_count, 1)
+
+            for name, value in [('FORECAST_INTERVAL_SAMPLES', 8), ('FORECAST_INTERVAL_LEVEL', 0.5),
+                                ('FORECAST_INTERVAL_NOISE', 0.2), ('FORECAST_INTERVAL_SEED', 1)]:
+                future.delete()
+                with self.settings(**{name: value}):
+                    utils.save_all_predictions_to_db()
+                self.assertEqual(predict.call_args.kwargs[name[len('FORECAST_INTERVAL_'):].lower()], value)
+            self.assertEqual(predict.call_count, 5)
+
+
+class IngestCasesTests(TestCase):
+    def test_bulk_upsert_reports_inserted_updated_and_unchanged(self):
+        from api.utils import ingest_cases
+
+        CovidData.objects.create(date=date(2021, 1, 1), cases=10)
+        CovidData.objects.create(date=date(2021, 1, 2), cases=20)
+        df = pd.DataFrame({
+            'date': ['2021-01-01', '2021-01-02', '2021-01-03', '2021-01-04'],
+            'cases_new': [10, 25, 30, 40],
+        })
+
+        counts = ingest_cases(df, batch_size=1)
+
+        self.assertEqual(counts, {'inserted': 2, 'updated': 1, 'unchanged': 1})
+        self.assertEqual(
+            list(CovidData.objects.order_by('date').values_list('cases', flat=True)),
+            [10, 25, 30, 40],
+        )
+        self.assertEqual(ingest_cases(df), {'inserted': 0, 'updated': 0, 'unchanged': 4})
+
+    def test_running_totals_follow_inserts_and_revisions(self):
+        from api.utils import ingest_cases, ingest_deaths
+
+        ingest_cases(pd.DataFrame({'date': ['2021-01-01', '2021-01-02'], 'cases_new': [10, 20]}))
+        ingest_deaths(pd.DataFrame({'date': ['2021-01-01'], 'deaths_new': [1]}))
+        ingest_cases(pd.DataFrame({'date': ['2021-01-02', '2021-01-03'], 'cases_new': [25, 30]}))
+        ingest_deaths(pd.DataFrame({'date': ['2021-01-01', '2021-01-02'], 'deaths_new': [1, 2]}))
+
+        response = self.client.get('/summary/')
+        self.assertEqual(response.json(), {'summary': {'total_cases': 65, 'total_deaths': 3, 'total_recovered': 0}})
+        self.assertEqual(RunningTotal.objects.get(name='cases').value, sum(CovidData.objects.values_list('cases', flat=True)))
+        self.assertEqual(self.client.get('/summary/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_state_summary_is_updated_incrementally(self):
+        from api.utils import ingest_state_cases
+
+        df = pd.DataFrame({
+            'date': ['2021-01-01', '2021-01-01', '2021-01-02'],
+            'state': ['Johor', 'Perlis', 'Johor'],
+            'cases_new': [10, 3, 20],
+            'cases_recovered': [1, 0, 2],
+        })
+        self.assertEqual(ingest_state_cases(df), {'inserted': 3, 'updated': 0, 'unchanged': 0})
+
+        # A revised day and a new day only apply their differences
+        df = pd.DataFrame({
+            'date': ['2021-01-01', '2021-01-01', '2021-01-02', '2021-01-03'],
+            'state': ['Johor', 'Perlis', 'Johor', 'Perlis'],
+            'cases_new': [15, 3, 20, 4],
+            'cases_recovered': [1, 0, 2, 5],
+        })
+        self.assertEqual(ingest_state_cases(df), {'inserted': 1, 'updated': 1, 'unchanged': 2})
+
+        summaries = {
+            s.state: (s.total_cases, s.total_recovered, s.latest_date, s.latest_cases)
+            for s in StateSummary.objects.all()
+        }
+        self.assertEqual(summaries, {
+            'Johor': (35, 3, date(2021, 1, 2), 20),
+            'Perlis': (7, 5, date(2021, 1, 3), 4),
+        })
+
+
+class CSVHandler(BaseHTTPRequestHandler):
+    """
+    Serves the HTTPServer's body attribute with its etag attribute as the ETag, answers a
+    matching If-None-Match with 304 and records the request headers in its requests list.
+    """
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == self.server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = self.server.body.encode()
+        self.send_response(200)
+        self.send_header('ETag', self.server.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FetchAndUpdateTests(TestCase):
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), CSVHandler)
+        self.server.requests = []
+        self.server.etag = '"v1"'
+        self.server.body = "date,cases_new\n2021-01-01,10\n2021-01-02,20\n"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        cache = tempfile.TemporaryDirectory()
+        self.addCleanup(cache.cleanup)
+        self.cache_dir = cache.name
+        self.url = f"http://127.0.0.1:{self.server.server_port}/cases_malaysia.csv"
+
+    def fetch(self):
+        from api.utils import fetch_and_update_data
+
+        with self.settings(DATA_FETCH_MAX_AGE=0):
+            return fetch_and_update_data(url=self.url, cache_dir=self.cache_dir)
+
+    def test_unchanged_payload_skips_ingestion(self):
+        self.assertEqual(self.fetch(), {'inserted': 2, 'updated': 0, 'unchanged': 0})
+
+        # Same ETag: conditional request answered with 304
+        self.assertIsNone(self.fetch())
+        self.assertEqual(self.server.requests[-1].get('If-None-Match'), '"v1"')
+
+        # New ETag but identical bytes: content hash matches
+        self.server.etag = '"v2"'
+        self.assertIsNone(self.fetch())
+
+        self.server.etag = '"v3"'
+        self.server.body += "2021-01-03,30\n"
+        self.assertEqual(self.fetch(), {'inserted': 1, 'updated': 0, 'unchanged': 2})
+
+    def test_fresh_cache_makes_no_request(self):
+        from api.utils import fetch_and_update_data
+
+        self.fetch()
+        with self.settings(DATA_FETCH_MAX_AGE=3600):
+            self.assertIsNone(fetch_and_update_data(url=self.url, cache_dir=self.cache_dir))
+        self.assertEqual(len(self.server.requests), 1)
+
+
+class RefreshSchedulerTests(TestCase):
+    def setUp(self):
+        cache = tempfile.TemporaryDirectory()
+        self.addCleanup(cache.cleanup)
+        override = self.settings(DATA_CACHE_DIR=cache.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    @mock.patch('api.utils.save_all_predictions_to_db')
+    @mock.patch('api.utils.fetch_and_update_state_data')
+    @mock.patch('api.utils.fetch_and_update_deaths_data')
+    @mock.patch('api.utils.fetch_and_update_data')
+    def test_refresh_is_single_flight(self, fetch, fetch_deaths, fetch_states, save):
+        from api.scheduler import refresh_data, single_flight
+
+        with single_flight() as acquired:
+            self.assertTrue(acquired)
+            self.assertFalse(refresh_data())
+        fetch.assert_not_called()
+
+        self.assertTrue(refresh_data())
+        fetch.assert_called_once()
+        fetch_deaths.assert_called_once()
+        fetch_states.assert_called_once()
+        save.assert_called_once()
+
+    @mock.patch('api.utils.save_all_predictions_to_db')
+    @mock.patch('api.utils.fetch_and_update_state_data')
+    @mock.patch('api.utils.fetch_and_update_deaths_data')
+    @mock.patch('api.utils.fetch_and_update_data')
+    def test_recent_refresh_is_not_repeated(self, fetch, fetch_deaths, fetch_states, save):
+        from api.scheduler import refresh_data
+
+        self.assertTrue(refresh_data(min_interval=3600))
+        self.assertFalse(refresh_data(min_interval=3600))
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_background_refresh_only_in_serving_processes(self):
+        from api.scheduler import _is_serving_process
+
+        with mock.patch.dict(os.environ, {'RUN_MAIN': 'true'}):
+            self.assertTrue(_is_serving_process(['manage.py', 'runserver']))
+            self.assertTrue(_is_serving_process(['/usr/bin/django-admin', 'runserver']))
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertFalse(_is_serving_process(['manage.py', 'runserver']))
+            self.assertTrue(_is_serving_process(['manage.py', 'runserver', '--noreload']))
+
+        self.assertTrue(_is_serving_process(['/venv/bin/gunicorn', 'Covid19.wsgi']))
+        self.assertTrue(_is_serving_process(['/venv/lib/uvicorn/__main__.py', 'Covid19.asgi:application']))
+        self.assertTrue(_is_serving_process(['mod_wsgi']))
+
+        self.assertFalse(_is_serving_process(['manage.py', 'migrate']))
+        self.assertFalse(_is_serving_process(['/usr/bin/django-admin', 'migrate']))
+        self.assertFalse(_is_serving_process(['/venv/lib/django/__main__.py', 'shell']))
+        self.assertFalse(_is_serving_process(['/venv/bin/celery', '-A', 'Covid19', 'worker']))
+        self.assertFalse(_is_serving_process(['/venv/bin/pytest', '-q']))
+        self.assertFalse(_is_serving_process([]))
+
+
+class ModelRegistryTests(TestCase):
+    def test_read_only_code_paths_do_not_import_tensorflow(self):
+        code = (
+            "import sys, django; django.setup(); "
+            "import api.views, api.utils; "
+            "from api.registry import registry; registry.get('scaler'); "
+            "sys.exit('tensorflow' in sys.modules)"
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ['DJANGO_SETTINGS_MODULE'])
+        subprocess.run([sys.executable, '-c', code], env=env, check=True, capture_output=True)
+
+    def test_models_are_loaded_once_and_timed(self):
+        from api.registry import registry
+
+        self.assertIs(registry.get('rf_model'), registry.get('rf_model'))
+        self.assertIn('rf_model', registry.load_timings)
+
+
+class RuntimeThreadingTests(TestCase):
+    def rf_threads_used(self, rows):
+        from joblib import effective_n_jobs
+        from api.runtime import rf_predict
+
+        model = mock.Mock()
+        model.predict.side_effect = lambda X: effective_n_jobs(None)
+        return rf_predict(model, np.zeros((rows, 60)))
+
+    @override_settings(RF_N_JOBS=3, RF_PARALLEL_MIN_ROWS=100)
+    def test_random_forest_threads_follow_batch_size_and_budget(self):
+        from api.registry import registry
+        from api.runtime import _parallel_slot, thread_budget
+
+        self.assertIsNone(registry.get('rf_model').n_jobs)
+        self.assertEqual(self.rf_threads_used(100), 3)
+        self.assertEqual(self.rf_threads_used(99), 1)
+        with thread_budget(2):
+            self.assertEqual(self.rf_threads_used(100), 2)
+        self.assertEqual(self.rf_threads_used(100), 3)
+
+        # A second concurrent parallel prediction falls back to one thread, unless its
+        # caller gave it an explicit budget
+        with _parallel_slot:
+            self.assertEqual(self.rf_threads_used(100), 1)
+            with thread_budget(2):
+                self.assertEqual(self.rf_threads_used(100), 2)
+
+    @override_settings(INFERENCE_THREADS=4, RF_PARALLEL_MIN_ROWS=100)
+    def test_concurrent_budgeted_jobs_each_get_their_share(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from joblib import effective_n_jobs
+        from api.runtime import rf_predict, thread_budget
+
+        both_predicting = threading.Barrier(2, timeout=10)
+
+        def predict(X):
+            both_predicting.wait()
+            return effective_n_jobs(None)
+
+        model = mock.Mock()
+        model.predict.side_effect = predict
+
+        def job(_):
+            with thread_budget(2):
+                return rf_predict(model, np.zeros((100, 60)))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(list(executor.map(job, range(2))), [2, 2])
+
+    @override_settings(RF_N_JOBS=2, RF_PARALLEL_MIN_ROWS=1)
+    def test_tree_predictions_average_to_forest_prediction(self):
+        from api.registry import registry
+        from api.runtime import rf_tree_predictions
+
+        rf_model = registry.get('rf_model')
+        X = np.random.default_rng(5).random((4, 60))
+        per_tree = rf_tree_predictions(rf_model, X)
+
+        self.assertEqual(per_tree.shape, (len(rf_model.estimators_), 4))
+        np.testing.assert_allclose(per_tree.mean(axis=0), rf_model.predict(X))
+
+
+class RecursiveForecastTests(TestCase):
+    def test_fast_path_matches_legacy_forecast(self):
+        from api.management.commands.benchmark_forecast import legacy_predict_with_hybrid_model
+        from api.utils import predict_with_hybrid_model
+
+        data = np.random.default_rng(1).random((60, 1))
+        legacy = legacy_predict_with_hybrid_model(data, days=5)
+        fast = predict_with_hybrid_model(data, days=5)
+
+        np.testing.assert_allclose(fast, legacy, atol=0.5)
+
+    def test_lockstep_batch_matches_one_window_at_a_time(self):
+        from api.utils import forecast_batch, predict_with_hybrid_model
+
+        windows = np.random.default_rng(3).random((5, 60))
+        batched = forecast_batch(windows, days=4)
+        self.assertEqual(batched.shape, (5, 4))
+        np.testing.assert_allclose(forecast_batch(windows, days=4, batch_size=2), batched, atol=0.5)
+        for window, row in zip(windows, batched):
+            np.testing.assert_allclose(predict_with_hybrid_model(window, days=4), row, atol=0.5)
+
+    def test_prediction_interval_widens_with_level_and_noise(self):
+        from api.utils import predict_with_hybrid_model, predict_with_intervals
+
+        data = np.random.default_rng(4).random((60, 1)) * 0.5
+
+        def width(**kwargs):
+            predicted, lower, upper = predict_with_intervals(data, days=5, samples=32, **kwargs)
+            np.testing.assert_allclose(predicted, predict_with_hybrid_model(data, days=5), atol=0.5)
+            return upper - lower
+
+        narrow = width(level=0.5, noise=0.05)
+        np.testing.assert_array_equal(width(level=0.5, noise=0.05), narrow)
+        self.assertTrue(np.all(width(level=0.95, noise=0.05) >= narrow))
+        self.assertGreater(width(level=0.95, noise=0.05).sum(), narrow.sum())
+        self.assertGreater(width(level=0.5, noise=0.3).sum(), narrow.sum())
+
+
+class BacktestTests(TestCase):
+    def test_one_day_horizon_matches_existing_date_predictions(self):
+        from api.backtest import run_backtest
+        from api.utils import predict_cases_for_existing_dates
+
+        cases = create_cases(75)
+        report = run_backtest(days=1, jobs=2)
+        self.assertEqual(report['origins'], 15)
+
+        predicted = np.array(list(predict_cases_for_existing_dates().values()))
+        errors = predicted - cases[60:]
+        self.assertAlmostEqual(report['metrics'][0]['rmse'], np.sqrt(np.mean(errors ** 2)), delta=0.5)
+        self.assertAlmostEqual(report['metrics'][0]['mae'], np.mean(np.abs(errors)), delta=0.5)
+
+    def test_command_saves_metrics_and_report(self):
+        from django.core.management import call_command
+
+        create_cases(70)
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'report.json')
+            call_command('backtest', '--days', '3', '--start', '2021-03-03', '--output', output, stdout=StringIO())
+            with open(output) as f:
+                report = json.load(f)
+
+        self.assertEqual((report['start_date'], report['end_date'], report['origins']), ('2021-03-03', '2021-03-09', 7))
+        self.assertEqual(
+            list(BacktestMetric.objects.filter(run_id=report['run_id']).order_by('horizon').values_list('horizon', flat=True)),
+            [1, 2, 3],
+        )
+
+
+class AffineScalerTests(TestCase):
+    def test_matches_fitted_sklearn_scaler(self):
+        from api.registry import registry
+
+        sklearn_scaler = registry.get('sklearn_scaler')
+        scaler = registry.get('scaler')
+        values = np.random.default_rng(2).integers(0, 40000, size=(50, 1)).astype(float)
+        frame = pd.DataFrame(values, columns=["cases_new"])
+
+        np.testing.assert_allclose(scaler.transform(values), sklearn_scaler.transform(frame))
+        np.testing.assert_allclose(
+            scaler.inverse_transform(values / 40000), sklearn_scaler.inverse_transform(frame / 40000)
+        )
+        # Any shape, including scalars, keeps its shape
+        self.assertEqual(scaler.transform(values.reshape(5, 10)).shape, (5, 10))
+        expected = sklearn_scaler.transform(pd.DataFrame([[1000.0]], columns=["cases_new"]))[0, 0]
+        self.assertAlmostEqual(float(scaler.transform(1000.0)), expected)
+
+    def test_standard_scaler(self):
+        from sklearn.preprocessing import StandardScaler
+        from api.scaling import AffineScaler
+
+        values = np.random.default_rng(3).normal(100, 20, size=(30, 1))
+        sklearn_scaler = StandardScaler().fit(values)
+        scaler = AffineScaler.from_sklearn(sklearn_scaler)
+
+        np.testing.assert_allclose(scaler.transform(values), sklearn_scaler.transform(values))
+        np.testing.assert_allclose(scaler.inverse_transform(values), sklearn_scaler.inverse_transform(values))
+
+
+@override_settings(CACHES=FORECAST_TEST_CACHES, FORECAST_CACHE_SIZE=2)
+class ForecastCacheTests(TestCase):
+    def test_identical_windows_hit_the_cache(self):
+        from api.forecast_cache import ForecastCache
+
+        cache = ForecastCache()
+        compute = mock.Mock(side_effect=lambda window, days: list(range(days)))
+        window = np.linspace(0, 1, 60).reshape(60, 1)
+
+        self.assertEqual(cache.get_or_compute(window, 3, compute), [0, 1, 2])
+        self.assertEqual(cache.get_or_compute(window.copy(), 3, compute), [0, 1, 2])
+        cache.get_or_compute(window, 4, compute)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 2, 'memory_entries': 2})
+
+        # A new process (empty LRU) still finds the result in the Django cache
+        fresh = ForecastCache()
+        fresh.get_or_compute(window, 3, compute)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(fresh.stats()['hits'], 1)
+
+    def test_lru_evicts_least_recently_used(self):
+        from api.forecast_cache import ForecastCache
+
+        cache = ForecastCache()
+
+        def compute(window, days):
+            return [float(window[0])]
+
+        for start in (1.0, 2.0, 3.0):
+            cache.get_or_compute(np.full(60, start), 1, compute)
+        self.assertEqual(cache.stats()['memory_entries'], 2)
+        self.assertNotIn(cache.key(np.full(60, 1.0), 1), cache._memory)
+
+
+@override_settings(CACHES=FORECAST_TEST_CACHES)
+class StateForecastTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.cases = {'Johor': rng.integers(0, 3000, size=70), 'Perlis': rng.integers(0, 300, size=65)}
+        StateCases.objects.bulk_create(
+            StateCases(state=state, date=date(2021, 1, 1) + timedelta(days=i), cases_new=int(value))
+            for state, values in self.cases.items()
+            for i, value in enumerate(values)
+        )
+
+    def test_batched_state_forecast_matches_single_series(self):
+        from api.registry import registry
+        from api.utils import predict_with_hybrid_model, save_state_predictions_to_db
+
+        self.assertEqual(save_state_predictions_to_db(days=3), 6)
+        self.assertEqual(save_state_predictions_to_db(days=3), 0)  # Already up to date
+
+        scaler = registry.get('scaler')
+        for state, values in self.cases.items():
+            expected = predict_with_hybrid_model(scaler.transform(values[-60:].astype(float)), days=3)
+            stored = StatePredictedCases.objects.filter(state=state).order_by('date')
+            self.assertEqual(stored[0].date, date(2021, 1, 1) + timedelta(days=len(values)))
+            np.testing.assert_allclose([p.predicted_cases for p in stored], expected, atol=1)
+
+        response = self.client.get('/states/predict/', {'state': 'Perlis', 'format': 'columns'})
+        self.assertEqual(read_json(response)['predictions']['date'], ['2021-03-07', '2021-03-08', '2021-03-09'])
+        self.assertEqual(self.client.get('/states/predict/').status_code, 400)
+
+    def test_short_history_state_does_not_force_a_refresh(self):
+        from api.utils import save_state_predictions_to_db
+
+        StateCases.objects.bulk_create(
+            StateCases(state='W.P. Labuan', date=date(2021, 1, 1) + timedelta(days=i), cases_new=i) for i in range(20)
+        )
+        self.assertEqual(save_state_predictions_to_db(days=3), 6)
+        self.assertFalse(StatePredictedCases.objects.filter(state='W.P. Labuan').exists())
+
+        with mock.patch('api.utils.forecast_batch') as forecast_batch:
+            self.assertEqual(save_state_predictions_to_db(days=3), 0)
+        forecast_batch.assert_not_called()
+
+
+@override_settings(CACHES=FORECAST_TEST_CACHES)
+class SeriesEndpointTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        create_cases(3)
+
+    def test_conditional_get_returns_304(self):
+        response = self.client.get('/current_cases/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(read_json(response)['current_cases']), 3)
+        self.assertIn('max-age=300', response['Cache-Control'])
+
+        etag = response['ETag']
+        with self.assertNumQueries(0):  # The table version is cached
+            response = self.client.get('/current_cases/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # Updating a value changes the version once the cached one is invalidated
+        CovidData.objects.filter(date=date(2021, 1, 1)).update(cases=F('cases') + 1)
+        invalidate_table_versions()
+        response = self.client.get('/current_cases/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_ingestion_invalidates_the_cached_version(self):
+        from api.utils import ingest_cases
+
+        etag = self.client.get('/current_cases/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            ingest_cases(pd.DataFrame({'date': ['2021-02-01'], 'cases_new': [5]}))
+        response = self.client.get('/current_cases/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(read_json(response)['current_cases']), 4)
+
+    def test_body_is_memoized_per_version(self):
+        self.client.get('/predict/')
+        PredictedCases.objects.create(date=date(2021, 1, 1), predicted_cases=5)
+        invalidate_table_versions()
+
+        with self.assertNumQueries(2):
+            first = read_body(self.client.get('/predict/'))  # streamed
+        with self.assertNumQueries(0):
+            second = self.client.get('/predict/')  # memoized, cached version
+        self.assertFalse(second.streaming)
+        self.assertEqual(first, second.content)
+        self.assertEqual(json.loads(first), {'predictions': [
+            {'date': '2021-01-01', 'predicted_cases': 5, 'lower_cases': None, 'upper_cases': None},
+        ]})
+
+    def test_changed_interval_bounds_change_the_version(self):
+        PredictedCases.objects.create(date=date(2021, 1, 4), predicted_cases=5, lower_cases=1, upper_cases=9)
+        etag = self.client.get('/predict/')['ETag']
+
+        PredictedCases.objects.filter(date=date(2021, 1, 4)).update(lower_cases=3, upper_cases=7)
+        invalidate_table_versions()
+        response = self.client.get('/predict/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(read_json(response), {'predictions': [
+            {'date': '2021-01-04', 'predicted_cases': 5, 'lower_cases': 3, 'upper_cases': 7},
+        ]})
+
+    def test_date_range_and_field_selection(self):
+        response = self.client.get('/current_cases/', {'start': '2021-01-02', 'end': '2021-01-03', 'fields': 'date'})
+        self.assertEqual(read_json(response), {'current_cases': [{'date': '2021-01-02'}, {'date': '2021-01-03'}]})
+
+    def test_cursor_pagination(self):
+        response = self.client.get('/current_cases/', {'limit': 2})
+        page = read_json(response)
+        self.assertEqual([row['date'] for row in page['current_cases']], ['2021-01-01', '2021-01-02'])
+        self.assertEqual(page['next_cursor'], '2021-01-02')
+
+        page = read_json(self.client.get('/current_cases/', {'limit': 2, 'cursor': page['next_cursor']}))
+        self.assertEqual([row['date'] for row in page['current_cases']], ['2021-01-03'])
+        self.assertIsNone(page['next_cursor'])
+
+    def test_invalid_parameters_return_400(self):
+        for params in ({'start': '01-01-2021'}, {'limit': '-1'}, {'fields': 'deaths'}):
+            response = self.client.get('/predict/', params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', read_json(response))
+
+    def test_combined_series_is_aligned_on_date(self):
+        PredictedCases.objects.create(date=date(2021, 1, 3), predicted_cases=7)
+        PredictedCases.objects.create(date=date(2021, 1, 4), predicted_cases=8)
+        actual = dict(CovidData.objects.values_list('date', 'cases'))
+
+        with self.assertNumQueries(3):  # two table versions, one UNION ALL
+            rows = read_json(self.client.get('/combined/', {'start': '2021-01-02'}))['combined']
+        self.assertEqual(rows, [
+            {'date': '2021-01-02', 'actual': actual[date(2021, 1, 2)], 'predicted': None},
+            {'date': '2021-01-03', 'actual': actual[date(2021, 1, 3)], 'predicted': 7},
+            {'date': '2021-01-04', 'actual': None, 'predicted': 8},
+        ])
+
+        page = read_json(self.client.get('/combined/', {'limit': 3, 'fields': 'predicted'}))
+        self.assertEqual(page['combined'][-1], {'date': '2021-01-03', 'predicted': 7})
+        self.assertEqual(page['next_cursor'], '2021-01-03')
+
+    def test_columnar_and_arrow_formats(self):
+        import pyarrow as pa
+
+        cases = list(CovidData.objects.order_by('date').values_list('cases', flat=True))
+        body = read_json(self.client.get('/current_cases/', {'format': 'columns'}))
+        self.assertEqual(body['current_cases'], {
+            'date': ['2021-01-01', '2021-01-02', '2021-01-03'], 'cases': cases,
+        })
+
+        response = self.client.get('/current_cases/', {'limit': 2}, HTTP_ACCEPT='application/vnd.apache.arrow.stream')
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.stream')
+        self.assertEqual(response['X-Next-Cursor'], '2021-01-02')
+        table = pa.ipc.open_stream(response.content).read_all()
+        self.assertEqual(table.column_names, ['date', 'cases'])
+        self.assertEqual(table.column('cases').to_pylist(), cases[:2])
+        self.assertEqual(table.column('date').to_pylist(), [date(2021, 1, 1), date(2021, 1, 2)])
+
+        self.assertEqual(self.client.get('/predict/', {'format': 'xml'}).status_code, 400)
+
+    @override_settings(API_STREAM_CHUNK_SIZE=2)
+    def test_streamed_json_matches_buffered_encoding(self):
+        from api.series import parse_series_query, series_payload
+
+        create_cases(4, start=date(2021, 2, 1), seed=1)
+        for params in ({}, {'limit': 4}, {'limit': 7}):
+            response = self.client.get('/current_cases/', params)
+            self.assertTrue(response.streaming)
+
+            query = parse_series_query(params and {'limit': str(params['limit'])}, ('date', 'cases'))
+            rows = list(CovidData.objects.order_by('date').values('date', 'cases'))
+            expected = json.dumps(series_payload('current_cases', rows, query), cls=DjangoJSONEncoder)
+            self.assertEqual(read_body(response).decode(), expected)
+
+    def test_responses_are_gzip_compressed(self):
+        import gzip
+
+        create_cases(100, start=date(2021, 2, 1), seed=1)
+        response = self.client.get('/current_cases/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertEqual(len(json.loads(gzip.decompress(read_body(response)))['current_cases']), 103)
+
+    def test_responses_are_brotli_compressed_when_available(self):
+        try:
+            import brotli
+        except ImportError:
+            self.skipTest("brotli is not installed")
+
+        create_cases(100, start=date(2021, 2, 1), seed=1)
+        for _ in range(2):  # streamed, then memoized
+            response = self.client.get('/current_cases/', HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertEqual(len(json.loads(brotli.decompress(read_body(response)))['current_cases']), 103)
+
+    def test_state_summary_endpoint(self):
+        StateSummary.objects.create(state='Perlis', total_cases=7, total_recovered=5,
+                                    latest_date=date(2021, 1, 3), latest_cases=4)
+        StateSummary.objects.create(state='Johor', total_cases=35, total_recovered=3,
+                                    latest_date=date(2021, 1, 2), latest_cases=20)
+
+        response = self.client.get('/states/', {'fields': 'total_cases', 'format': 'columns', 'limit': '1'})
+        self.assertEqual(read_json(response), {
+            'states': {'state': ['Johor', 'Perlis'], 'total_cases': [35, 7]},
+        })
+
+        etag = self.client.get('/states/')['ETag']
+        StateSummary.objects.filter(state='Johor').update(total_cases=F('total_cases') + 1)
+        invalidate_table_versions()
+        self.assertEqual(self.client.get('/states/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(CACHES=FORECAST_TEST_CACHES)
+class AsyncViewTests(TestCase):
+    async def read_async(self, response):
+        if not response.streaming:
+            return response.content
+        return b''.join([chunk async for chunk in response.streaming_content])
+
+    async def test_async_views_match_sync_views(self):
+        from asgiref.sync import sync_to_async
+        from django.core.cache import cache
+        from django.test import AsyncRequestFactory, RequestFactory
+        from api import views
+
+        await sync_to_async(create_cases)(5)
+        await PredictedCases.objects.acreate(date=date(2021, 1, 6), predicted_cases=9)
+
+        pairs = [
+            (views.show_all_current_cases, views.ashow_all_current_cases, '/current_cases/'),
+            (views.show_all_predictions, views.ashow_all_predictions, '/predict/'),
+            (views.show_combined_cases, views.ashow_combined_cases, '/combined/'),
+            (views.show_state_summary, views.ashow_state_summary, '/states/'),
+            (views.show_summary, views.ashow_summary, '/summary/'),
+        ]
+        for params in ({}, {'limit': 2, 'start': '2021-01-02'}, {'format': 'columns'}):
+            for sync_view, async_view, path in pairs:
+                await cache.aclear()
+                expected = await sync_to_async(lambda: read_body(sync_view(RequestFactory().get(path, params))))()
+                await cache.aclear()
+                response = await async_view(AsyncRequestFactory().get(path, params))
+                self.assertEqual(await self.read_async(response), expected)
+
+                # Memoized on the second call, 304 with the ETag
+                response = await async_view(AsyncRequestFactory().get(path, params))
+                self.assertEqual(await self.read_async(response), expected)
+                response = await async_view(AsyncRequestFactory().get(path, params, headers={'If-None-Match': response['ETag']}))
+                self.assertEqual(response.status_code, 304)
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'api_test_cache'},
+        'forecasts': FORECAST_TEST_CACHES['forecasts'],
+    })
+    async def test_async_views_start_a_version_generation_without_sync_cache_calls(self):
+        from asgiref.sync import sync_to_async
+        from django.core.cache import cache
+        from django.core.management import call_command
+        from django.test import AsyncRequestFactory
+        from api import views
+        from api.series import VERSION_GENERATION_KEY
+
+        # A database cache cannot be used synchronously from the event loop
+        await sync_to_async(call_command)('createcachetable', verbosity=0)
+        await sync_to_async(create_cases)(3)
+        self.assertIsNone(await cache.aget(VERSION_GENERATION_KEY))
+
+        response = await views.ashow_all_current_cases(AsyncRequestFactory().get('/current_cases/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(await self.read_async(response))['current_cases']), 3)
+        self.assertIsNotNone(await cache.aget(VERSION_GENERATION_KEY))
@@ -1,44 +1,216 @@
 from datetime import timedelta
-import requests
+from functools import partial
 import pandas as pd
 from io import StringIO
-from .models import CovidData, PredictedCases
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max
+from .fetch import fetch_csv, mark_ingested
+from .forecast_cache import forecast_cache
+from .models import (
+    CovidData, DeathsData, PredictedCases, RunningTotal, StateCases, StatePredictedCases, StateSummary,
+)
+from .registry import registry
+from .runtime import rf_predict, rf_tree_predictions
+from .series import invalidate_table_versions
 import numpy as np
-import joblib
-from keras.models import load_model
-import matplotlib.pyplot as plt
+from numpy.lib.stride_tricks import sliding_window_view
 
 
+RAW_URL = "https://raw.githubusercontent.com/MoH-Malaysia/covid19-public/refs/heads/main/epidemic/cases_malaysia.csv"
+DEATHS_URL = "https://raw.githubusercontent.com/MoH-Malaysia/covid19-public/refs/heads/main/epidemic/deaths_malaysia.csv"
+STATE_URL = "https://raw.githubusercontent.com/MoH-Malaysia/covid19-public/refs/heads/main/epidemic/cases_state.csv"
 
-# Load the pre-fitted scaler
-with open('api/models/scaler.pkl', 'rb') as s:
-    scaler = joblib.load(s)
+def add_to_running_totals(deltas):
+    """
+    Adjust the headline counters by the given differences, creating missing counters.
+    Each counter is updated with a single UPDATE ... SET value = value + delta, so concurrent
+    ingests cannot lose increments. Call it inside the transaction that changed the rows.
+    :param deltas: Dictionary of counter name -> difference.
+    """
+    for name, delta in deltas.items():
+        if delta and not RunningTotal.objects.filter(name=name).update(value=F('value') + delta):
+            RunningTotal.objects.create(name=name, value=delta)
 
-# Load the Random Forest model
-with open('api/models/Random_Forest.pkl', 'rb') as f:
-    rf_model = joblib.load(f)
 
-# Load LSTM model
-lstm_model = load_model('api/models/LSTM.keras', compile=False)
-lstm_model.compile(optimizer='adam', loss='mean_squared_error')
+def _ingest_daily(model, field, df, column, batch_size=None):
+    """
+    Bulk upsert one daily national series (one row per date) and update its running total.
+    Existing rows are read in one query and diffed against the frame; new dates are inserted
+    with bulk_create and changed values with bulk_update, in batches inside one transaction.
+    """
+    batch_size = batch_size or getattr(settings, 'INGEST_BATCH_SIZE', 500)
+
+    # Later rows win, like repeated update_or_create calls would
+    frame = df[['date', column]].dropna()
+    incoming = dict(zip(pd.to_datetime(frame['date']).dt.date, frame[column].astype(int)))
+
+    with transaction.atomic():
+        # Load existing (date, value) pairs in a single query
+        existing = {
+            entry_date: (pk, value)
+            for pk, entry_date, value in model.objects.values_list('id', 'date', field)
+        }
+
+        to_create, to_update = [], []
+        delta = 0
+        for entry_date, value in incoming.items():
+            value = int(value)
+            if entry_date not in existing:
+                to_create.append(model(date=entry_date, **{field: value}))
+                delta += value
+            elif existing[entry_date][1] != value:
+                to_update.append(model(id=existing[entry_date][0], date=entry_date, **{field: value}))
+                delta += value - existing[entry_date][1]
+
+        model.objects.bulk_create(to_create, batch_size=batch_size)
+        model.objects.bulk_update(to_update, [field], batch_size=batch_size)
+        add_to_running_totals({field: delta})
+        transaction.on_commit(invalidate_table_versions)
+
+    return {
+        'inserted': len(to_create),
+        'updated': len(to_update),
+        'unchanged': len(incoming) - len(to_create) - len(to_update),
+    }
+
+
+def ingest_cases(df, batch_size=None):
+    """
+    Bulk upsert daily cases from a cases_malaysia.csv frame into CovidData.
+    :param df: DataFrame with 'date' and 'cases_new' columns.
+    :param batch_size: Rows per INSERT/UPDATE statement, defaults to settings.INGEST_BATCH_SIZE.
+    :return: Dictionary with the number of inserted, updated and unchanged rows.
+    """
+    return _ingest_daily(CovidData, 'cases', df, 'cases_new', batch_size)
 
 
-RAW_URL = "https://raw.githubusercontent.com/MoH-Malaysia/covid19-public/refs/heads/main/epidemic/cases_malaysia.csv"
+def ingest_deaths(df, batch_size=None):
+    """
+    Bulk upsert daily deaths from a deaths_malaysia.csv frame into DeathsData.
+    :param df: DataFrame with 'date' and 'deaths_new' columns.
+    :param batch_size: Rows per INSERT/UPDATE statement, defaults to settings.INGEST_BATCH_SIZE.
+    :return: Dictionary with the number of inserted, updated and unchanged rows.
+    """
+    return _ingest_daily(DeathsData, 'deaths', df, 'deaths_new', batch_size)
 
-def fetch_and_update_data():
-    response = requests.get(RAW_URL)
-    if response.status_code == 200:
-        csv_data = StringIO(response.text)
-        df = pd.read_csv(csv_data)
 
-        for _, row in df.iterrows():
-            CovidData.objects.update_or_create(
-                date=row['date'],
-                defaults={'cases': row['cases_new']}
+def ingest_state_cases(df, batch_size=None):
+    """
+    Bulk upsert a cases_state.csv frame into StateCases and refresh StateSummary incrementally.
+    Only inserted and changed rows touch the summaries: their differences are added to the
+    per-state totals and the 'recovered' running total, and the latest-day snapshot moves
+    forward when a newer day arrives.
+    :param df: DataFrame with 'date', 'state', 'cases_new' and 'cases_recovered' columns.
+    :param batch_size: Rows per INSERT/UPDATE statement, defaults to settings.INGEST_BATCH_SIZE.
+    :return: Dictionary with the number of inserted, updated and unchanged rows.
+    """
+    batch_size = batch_size or getattr(settings, 'INGEST_BATCH_SIZE', 500)
+
+    frame = df[['date', 'state', 'cases_new', 'cases_recovered']].dropna(subset=['date', 'state', 'cases_new'])
+    incoming = {
+        (state, entry_date): (int(cases), int(recovered))
+        for state, entry_date, cases, recovered in zip(
+            frame['state'], pd.to_datetime(frame['date']).dt.date,
+            frame['cases_new'], frame['cases_recovered'].fillna(0),
+        )
+    }
+
+    with transaction.atomic():
+        existing = {
+            (state, entry_date): (pk, cases, recovered)
+            for pk, state, entry_date, cases, recovered in StateCases.objects.values_list(
+                'id', 'state', 'date', 'cases_new', 'cases_recovered'
             )
-        print("Data fetched and updated successfully!")
-    else:
-        print(f"Failed to fetch data: {response.status_code}")
+        }
+
+        to_create, to_update = [], []
+        deltas = {}  # state -> [cases difference, recovered difference]
+        newest = {}  # state -> (date, cases) of the newest inserted or changed row
+        for (state, entry_date), (cases, recovered) in incoming.items():
+            old = existing.get((state, entry_date))
+            if old is None:
+                to_create.append(StateCases(state=state, date=entry_date, cases_new=cases, cases_recovered=recovered))
+                old_cases, old_recovered = 0, 0
+            elif old[1:] != (cases, recovered):
+                to_update.append(StateCases(id=old[0], cases_new=cases, cases_recovered=recovered))
+                old_cases, old_recovered = old[1:]
+            else:
+                continue
+
+            delta = deltas.setdefault(state, [0, 0])
+            delta[0] += cases - old_cases
+            delta[1] += recovered - old_recovered
+            if state not in newest or entry_date >= newest[state][0]:
+                newest[state] = (entry_date, cases)
+
+        StateCases.objects.bulk_create(to_create, batch_size=batch_size)
+        StateCases.objects.bulk_update(to_update, ['cases_new', 'cases_recovered'], batch_size=batch_size)
+
+        summaries = {s.state: s for s in StateSummary.objects.select_for_update().filter(state__in=deltas)}
+        for state, (cases, recovered) in deltas.items():
+            summary = summaries.setdefault(state, StateSummary(state=state))
+            summary.total_cases += cases
+            summary.total_recovered += recovered
+            entry_date, latest_cases = newest[state]
+            if summary.latest_date is None or entry_date >= summary.latest_date:
+                summary.latest_date, summary.latest_cases = entry_date, latest_cases
+
+        StateSummary.objects.bulk_create([s for s in summaries.values() if s.pk is None])
+        StateSummary.objects.bulk_update(
+            [s for s in summaries.values() if s.pk is not None],
+            ['total_cases', 'total_recovered', 'latest_date', 'latest_cases'],
+        )
+        add_to_running_totals({'recovered': sum(recovered for _, recovered in deltas.values())})
+        transaction.on_commit(invalidate_table_versions)
+
+    return {
+        'inserted': len(to_create),
+        'updated': len(to_update),
+        'unchanged': len(incoming) - len(to_create) - len(to_update),
+    }
+
+
+def _fetch_and_ingest(url, ingest, label, cache_dir=None):
+    """
+    Download a CSV and pass it to ingest, skipping all parsing and database work
+    when the file has not changed since the last successful ingestion.
+    """
+    result = fetch_csv(url, cache_dir=cache_dir)
+    if result.status == 'failed':
+        print(f"Failed to fetch {label}: {result.status_code}")
+        return None
+    if result.status != 'changed':
+        print(f"{label.capitalize()} unchanged ({result.status}), skipping ingestion.")
+        return None
+
+    df = pd.read_csv(StringIO(result.text))
+    counts = ingest(df)
+    mark_ingested(url, result.digest, cache_dir=cache_dir)
+    print(f"{label.capitalize()} fetched and updated successfully! "
+          "({inserted} inserted, {updated} updated, {unchanged} unchanged)".format(**counts))
+    return counts
+
+
+def fetch_and_update_data(url=RAW_URL, cache_dir=None):
+    """
+    Download the national daily cases CSV and ingest it into CovidData.
+    """
+    return _fetch_and_ingest(url, ingest_cases, "cases data", cache_dir=cache_dir)
+
+
+def fetch_and_update_deaths_data(url=DEATHS_URL, cache_dir=None):
+    """
+    Download the national daily deaths CSV and ingest it into DeathsData.
+    """
+    return _fetch_and_ingest(url, ingest_deaths, "deaths data", cache_dir=cache_dir)
+
+
+def fetch_and_update_state_data(url=STATE_URL, cache_dir=None):
+    """
+    Download the per-state cases CSV and ingest it into StateCases and StateSummary.
+    """
+    return _fetch_and_ingest(url, ingest_state_cases, "state cases data", cache_dir=cache_dir)
 
 
 #
@@ -52,23 +224,50 @@ def preprocess_data(window_size=60):
     """
     Fetches recent data from the database, scales it using the pre-fitted scaler.
     """
+    scaler = registry.get('scaler')
+
     # Fetch recent data
     data = list(CovidData.objects.order_by('-date').values_list('cases', flat=True))[:window_size]
     data.reverse()  # Ensure chronological order
 
-    # Convert to DataFrame to provide feature names
-    data_df = pd.DataFrame(data, columns=["cases_new"])
-
-    # Transform using the pre-fitted scaler
-    scaled_data = scaler.transform(data_df)
+    # Transform using the pre-fitted scaler, as a (window_size, 1) column
+    scaled_data = scaler.transform(np.array(data, dtype=np.float64).reshape(-1, 1))
 
     return scaled_data
 
+def _predict_windows(windows, batch_size=512):
+    """
+    Run the hybrid model on a batch of 60-day scaled windows in one pass.
+    :param windows: Array of shape (N, 60) with scaled cases, oldest value first.
+    :param batch_size: Batch size used for the single LSTM call.
+    :return: Array of N predicted cases in the original scale, clipped at zero.
+    """
+    scaler = registry.get('scaler')
+    rf_model = registry.get('rf_model')
+    lstm_model = registry.get('lstm_model')
+
+    # One Random Forest call over every window
+    rf_predictions = rf_predict(rf_model, windows)
+
+    # Stack the last 30 days of each window with its RF prediction into (N, 30, 2)
+    lstm_input = np.empty((len(windows), 30, 2), dtype=np.float32)
+    lstm_input[:, :, 0] = windows[:, -30:]
+    lstm_input[:, :, 1] = rf_predictions[:, None]
+
+    # One batched LSTM call
+    lstm_predictions = lstm_model.predict(lstm_input, batch_size=batch_size, verbose=0)
+
+    # Inverse transform every prediction in one step and clip negative values
+    predicted_cases = scaler.inverse_transform(lstm_predictions).flatten()
+    return np.maximum(predicted_cases, 0)
+
+
 def predict_cases_for_existing_dates():
     """
-    Predict cases for all existing dates in the dataset without changing any other code.
-    This method will fetch the historical data, make predictions for each date,
-    and return the predictions in a dictionary with dates as keys and predicted cases as values.
+    Predict cases for all existing dates in the dataset.
+    All 60-day windows are built as one strided matrix and run through the hybrid model
+    as a single batch, instead of one Random Forest and one LSTM call per date.
+    :return: Dictionary with dates as keys and predicted cases as values.
     """
     # Fetch all historical data
     historical_data = list(CovidData.objects.order_by('date').values('date', 'cases'))
@@ -76,87 +275,246 @@ def predict_cases_for_existing_dates():
     # Extract dates and cases
     dates = [entry['date'] for entry in historical_data]
 
+    if len(dates) <= 60:
+        return {}
+
     # Use preprocess_data() to fetch and scale the data
-    scaled_cases = preprocess_data(window_size=len(historical_data))
+    scaled_cases = preprocess_data(window_size=len(historical_data)).flatten()
 
-    predictions = {}  # Dictionary to store predictions with corresponding dates
+    # Row k holds the 60 days before date k + 60 (a view, no copy)
+    windows = sliding_window_view(scaled_cases[:-1], 60)
 
-    # Predict for each date starting from the 30th record
-    for i in range(60, len(scaled_cases)):
-        # Prepare input for Random Forest
-        rf_input = scaled_cases[i-60:i].reshape(1, -1)
+    predicted_cases = _predict_windows(windows)
 
-        # Predict with Random Forest
-        rf_prediction = rf_model.predict(rf_input)
+    return dict(zip(dates[60:], predicted_cases))
 
-        # Prepare input for LSTM
-        lstm_input = np.hstack([scaled_cases[i-30:i].reshape(30, 1), np.full((30, 1), rf_prediction[0])])
-        lstm_input = lstm_input.reshape(1, 30, 2)
 
-        # Predict with LSTM
-        lstm_prediction = lstm_model.predict(lstm_input)
 
-        # Inverse transform the prediction to original scale
-        prediction_df = pd.DataFrame(lstm_prediction, columns=["cases_new"])
-        predicted_case = scaler.inverse_transform(prediction_df).flatten()[0]
+def predict_cases_for_dates(target_dates):
+    """
+    Predict cases only for the given dates, each from its own 60-day lookback window.
+    Dates that are not in the dataset or have fewer than 60 days of history are skipped.
+    :param target_dates: Iterable of dates to predict.
+    :return: Dictionary with dates as keys and predicted cases as values.
+    """
+    scaler = registry.get('scaler')
+
+    historical_data = list(CovidData.objects.order_by('date').values_list('date', 'cases'))
+    positions = {entry_date: i for i, (entry_date, _) in enumerate(historical_data)}
+
+    # Positions of the requested dates that have a full lookback window
+    targets = sorted(positions[d] for d in set(target_dates) if positions.get(d, 0) >= 60)
+    if not targets:
+        return {}
+
+    # Only scale the part of the series the earliest window reaches back to
+    first = targets[0] - 60
+    scaled_cases = scaler.transform([cases for _, cases in historical_data[first:]])
+
+    windows = rolling_origin_windows(scaled_cases, np.array(targets) - first)
 
-        # Clip negative values
-        predicted_case = max(predicted_case, 0)
+    predicted_cases = _predict_windows(windows)
 
-        # Store the prediction in the dictionary
-        predictions[dates[i]] = predicted_case
+    return {historical_data[i][0]: predicted for i, predicted in zip(targets, predicted_cases)}
+
+
+def forecast_batch(windows, days=21, batch_size=4096, rf_step=None):
+    """
+    Recursive forecast of N independent windows in lockstep, e.g. states, perturbed copies
+    of one window or historical forecast origins.
+    Every horizon step runs one Random Forest call on an (N, 60) matrix and one traced LSTM
+    call on an (N, 30, 2) tensor, so the cost grows with the number of steps rather than
+    with N x steps. The windows live in one (N, 60 + days) buffer that the predictions are
+    appended to, so sliding the windows forward is a view instead of a copy.
+    :param windows: Array of shape (N, 60) (or (N, 60, 1)) with scaled cases, oldest value first.
+    :param days: Number of future days to predict.
+    :param batch_size: Maximum number of windows advanced together, bounding memory for large N.
+    :param rf_step: Function mapping the (N, 60) windows of a step to their N Random Forest
+                    predictions, called once per step and batch; defaults to the forest mean.
+    :return: Array of shape (N, days) with predicted cases in the original scale, clipped at zero.
+    """
+    windows = np.asarray(windows, dtype=np.float64)
+    windows = windows.reshape(len(windows), -1)[:, -60:]
+    if len(windows) > batch_size:
+        return np.concatenate([
+            forecast_batch(windows[i:i + batch_size], days, batch_size, rf_step)
+            for i in range(0, len(windows), batch_size)
+        ])
+
+    scaler = registry.get('scaler')
+    rf_step = rf_step or partial(rf_predict, registry.get('rf_model'))
+    lstm_infer = registry.get('lstm_infer')
+
+    n = len(windows)
+    series = np.empty((n, 60 + days))  # Scaled history followed by the scaled predictions
+    series[:, :60] = windows
+    predictions = np.empty((n, days))
+    lstm_input = np.empty((n, 30, 2), dtype=np.float32)
+
+    for step in range(days):
+        window = series[:, step:step + 60]
+
+        # One Random Forest call for all windows
+        rf_predictions = rf_step(window)
+
+        # One LSTM call: last 30 days of each window next to its RF prediction
+        lstm_input[:, :, 0] = window[:, -30:]
+        lstm_input[:, :, 1] = rf_predictions[:, None]
+        lstm_predictions = lstm_infer(lstm_input)[:, 0]
+
+        # Convert back to the original scale, clip, and feed back in as the next day
+        predictions[:, step] = np.maximum(scaler.inverse_transform(lstm_predictions), 0)
+        series[:, 60 + step] = scaler.transform(predictions[:, step])
 
     return predictions
 
 
+def rolling_origin_windows(scaled_cases, origins):
+    """
+    Scaled 60-day windows ending just before each forecast origin, for forecast_batch.
+    :param scaled_cases: 1-D array of the scaled series.
+    :param origins: Positions in the series of the first forecast day; each must be >= 60.
+    :return: Array of shape (len(origins), 60), gathered from a strided view of the series.
+    """
+    scaled_cases = np.asarray(scaled_cases, dtype=np.float64).reshape(-1)
+    return sliding_window_view(scaled_cases, 60)[np.asarray(origins) - 60]
+
 
 def predict_with_hybrid_model(data, days=21):
     """
     Predict future cases for a specified number of days using the hybrid model.
+    This is forecast_batch with a single window.
     :param data: Preprocessed data (scaled and formatted for the models).
     :param days: Number of future days to predict.
     :return: Predicted cases for the next 'days' days.
     """
-    predictions = []
-    current_data = data.copy()
+    window = np.asarray(data, dtype=np.float64).reshape(1, -1)
+    return forecast_batch(window, days)[0].tolist()
+
+
+def predict_with_intervals(data, days=21, samples=None, level=None, noise=None, seed=None):
+    """
+    Point forecast plus a Monte Carlo prediction interval, computed as one forecast_batch.
+    Row 0 of the batch is the unperturbed window with the full Random Forest (the point
+    forecast). Each of the other rows is one sample path: its input window is perturbed
+    with log-normal noise, and every step uses the prediction of one randomly drawn tree
+    instead of the forest mean. All tree predictions of a step come from one pass over the
+    trees, and the LSTM runs once per step on all rows, so the cost is a small multiple of
+    the point forecast.
+    :param data: Scaled 60-day window, as for predict_with_hybrid_model.
+    :param days: Number of future days to predict.
+    :param samples: Number of sample paths, defaults to settings.FORECAST_INTERVAL_SAMPLES.
+    :param level: Interval coverage, defaults to settings.FORECAST_INTERVAL_LEVEL.
+    :param noise: Standard deviation of the log perturbation, defaults to settings.FORECAST_INTERVAL_NOISE.
+    :param seed: Random seed, defaults to settings.FORECAST_INTERVAL_SEED so the result is
+                 reproducible and cacheable.
+    :return: Array of shape (3, days): predicted cases, lower bounds and upper bounds. The
+             bounds are the quantiles of the sample paths, widened to include the point forecast.
+    """
+    samples = samples or getattr(settings, 'FORECAST_INTERVAL_SAMPLES', 32)
+    level = level or getattr(settings, 'FORECAST_INTERVAL_LEVEL', 0.9)
+    noise = getattr(settings, 'FORECAST_INTERVAL_NOISE', 0.05) if noise is None else noise
+    seed = getattr(settings, 'FORECAST_INTERVAL_SEED', 0) if seed is None else seed
 
-    for _ in range(days):
-        # Ensure Random Forest gets 60 days
-        rf_input = current_data[-60:].reshape(1, -1)
+    rf_model = registry.get('rf_model')
+    rng = np.random.default_rng(seed)
 
-        # Predict with Random Forest
-        rf_predictions = rf_model.predict(rf_input)  # Single prediction
+    n = samples + 1
+    windows = np.empty((n, 60))
+    windows[:] = np.asarray(data, dtype=np.float64).reshape(-1)[-60:]
+    windows[1:] *= np.exp(rng.normal(0, noise, (samples, 60)))
+    sampled = np.arange(1, n)
 
-        # Prepare input for LSTM
-        lstm_input = np.hstack([current_data[-30:].reshape(30, 1), np.full((30, 1), rf_predictions[0])])
-        lstm_input = lstm_input.reshape(1, 30, 2)  # Reshape to 3D for LSTM input
+    def sample_trees(window):
+        # (trees, n) predictions: their mean is the forest prediction of each row
+        per_tree = rf_tree_predictions(rf_model, window)
+        rf_predictions = per_tree.mean(axis=0)
+        rf_predictions[1:] = per_tree[rng.integers(len(per_tree), size=samples), sampled]
+        return rf_predictions
 
-        # Predict with LSTM
-        lstm_predictions = lstm_model.predict(lstm_input)
+    paths = forecast_batch(windows, days, batch_size=n, rf_step=sample_trees)
 
-        # Convert scaled output back to the original scale
-        # Wrap predictions in a DataFrame with correct column name
-        predictions_df = pd.DataFrame(lstm_predictions, columns=["cases_new"])
-        future_cases = scaler.inverse_transform(predictions_df).flatten()[0]
+    point = paths[0]
+    lower, upper = np.quantile(paths[1:], [(1 - level) / 2, (1 + level) / 2], axis=0)
+    return np.stack([point, np.minimum(lower, point), np.maximum(upper, point)])
 
-        # Clip negative values
-        future_cases = max(future_cases, 0)
 
-        # Append the prediction
-        predictions.append(future_cases)
+def predict_states(days=21):
+    """
+    Forecast the next days for every state with at least 60 days of history, batching
+    all states into one Random Forest and one LSTM call per step.
+    The states share the national models and scaler.
+    :param days: Number of future days to predict.
+    :return: Dictionary of state -> (last observed date, list of predicted cases).
+    """
+    scaler = registry.get('scaler')
 
-        new_case_df = pd.DataFrame([[future_cases]], columns=["cases_new"])  # Wrap in DataFrame
-        new_case_scaled = scaler.transform(new_case_df)
-        current_data = np.append(current_data[1:], new_case_scaled)
+    series = {}
+    for state, entry_date, cases in StateCases.objects.order_by('state', 'date').values_list(
+        'state', 'date', 'cases_new'
+    ):
+        dates, values = series.setdefault(state, ([], []))
+        dates.append(entry_date)
+        values.append(cases)
 
-    return predictions
+    states = [state for state, (dates, _) in series.items() if len(dates) >= 60]
+    if not states:
+        return {}
+
+    windows = scaler.transform(np.array([series[state][1][-60:] for state in states], dtype=np.float64))
+    predictions = forecast_batch(windows, days)
+
+    return {
+        state: (series[state][0][-1], predicted.tolist())
+        for state, predicted in zip(states, predictions)
+    }
+
+
+def save_state_predictions_to_db(days=21):
+    """
+    Forecast the next days for all states and store them in StatePredictedCases.
+    Each state's forecast starts the day after its latest observed date and replaces
+    any earlier forecast for those dates.
+    :return: Number of stored predictions.
+    """
+    # Skip the models when every state predict_states can forecast (60+ days of history)
+    # already has a forecast from its latest observed date
+    latest = dict(
+        StateCases.objects.values('state').annotate(last_date=Max('date'), days=Count('id'))
+        .filter(days__gte=60).values_list('state', 'last_date')
+    )
+    forecast_until = dict(StatePredictedCases.objects.values_list('state').annotate(Max('date')))
+    if latest and all(
+        forecast_until.get(state) == last_date + timedelta(days=days) for state, last_date in latest.items()
+    ):
+        print("State forecasts are up to date.")
+        return 0
+
+    forecasts = predict_states(days)
+    if not forecasts:
+        print("Not enough state data to predict.")
+        return 0
+
+    rows = [
+        StatePredictedCases(state=state, date=last_date + timedelta(days=i + 1), predicted_cases=int(value))
+        for state, (last_date, predicted) in forecasts.items()
+        for i, value in enumerate(predicted)
+    ]
+    with transaction.atomic():
+        for state, (last_date, _) in forecasts.items():
+            StatePredictedCases.objects.filter(state=state, date__gt=last_date).delete()
+        StatePredictedCases.objects.bulk_create(rows, batch_size=getattr(settings, 'INGEST_BATCH_SIZE', 500))
+        transaction.on_commit(invalidate_table_versions)
+
+    print(f"Saved {days}-day forecasts for {len(forecasts)} states.")
+    return len(rows)
 
 
 def save_all_predictions_to_db():
     """
     Check if dates are already predicted. If not, predict the values for:
     - Existing dates in the dataset using `predict_cases_for_existing_dates()`.
-    - Future 21 days using `predict_with_hybrid_model()`.
+    - Future 21 days with prediction intervals using `predict_with_intervals()`.
     Save all predictions into the database.
     """
     # Check existing predictions in the database
@@ -172,23 +530,28 @@ def save_all_predictions_to_db():
     # Find dates that need predictions
     dates_to_predict = current_dates - predicted_dates
 
-    # If there are dates to predict, call `predict_cases_for_existing_dates`
+    # If there are dates to predict, only compute the missing ones
     if dates_to_predict:
-        print("Predicting cases for existing dates...")
-        predictions = predict_cases_for_existing_dates()  # Predict for existing dates
-
-        # Save these predictions to the database
-        for date, predicted_case in predictions.items():
-            if date not in predicted_dates:  # Only save if not already in database
-                PredictedCases.objects.update_or_create(
-                    date=date,
-                    defaults={'predicted_cases': int(predicted_case)}
-                )
+        print(f"Predicting cases for {len(dates_to_predict)} existing dates...")
+        predictions = predict_cases_for_dates(dates_to_predict)
+
+        # Save these predictions to the database (none of them exist yet)
+        PredictedCases.objects.bulk_create(
+            PredictedCases(date=date, predicted_cases=int(predicted_case))
+            for date, predicted_case in predictions.items()
+        )
+        transaction.on_commit(invalidate_table_versions)
         print("Existing date predictions saved to database.")
-    print("Checking if future predictions are needed...")
 
     # Determine the start date for future predictions
     last_date = max(all_dates)
+
+    # Interval bounds only apply to future dates; drop them from forecasts that are now observed
+    if PredictedCases.objects.filter(date__lte=last_date).exclude(lower_cases=None, upper_cases=None).update(
+        lower_cases=None, upper_cases=None,
+    ):
+        transaction.on_commit(invalidate_table_versions)
+    print("Checking if future predictions are needed...")
     future_start_date = last_date + timedelta(days=1)
 
     # Generate the list of future dates to predict
@@ -203,16 +566,32 @@ def save_all_predictions_to_db():
     if set(future_dates) - existing_future_dates:
         print("Predicting cases for future 21 days...")
         recent_data = preprocess_data(window_size=60)  # Fetch and scale the recent 30 days
-        future_predictions = predict_with_hybrid_model(recent_data, days=21)
 
-        # Save future predictions to the database
+        # The interval settings are part of the cache key, so changing them recomputes the forecast
+        interval = {
+            'samples': getattr(settings, 'FORECAST_INTERVAL_SAMPLES', 32),
+            'level': getattr(settings, 'FORECAST_INTERVAL_LEVEL', 0.9),
+            'noise': getattr(settings, 'FORECAST_INTERVAL_NOISE', 0.05),
+            'seed': getattr(settings, 'FORECAST_INTERVAL_SEED', 0),
+        }
+        future_predictions, lower, upper = forecast_cache.get_or_compute(
+            recent_data, 21, partial(predict_with_intervals, **interval),
+            kind="intervals:{samples}:{level}:{noise}:{seed}".format(**interval),
+        )
+
+        # Save future predictions and their intervals to the database
         for i, predicted_case in enumerate(future_predictions):
             predicted_date = future_start_date + timedelta(days=i)
             if predicted_date not in existing_future_dates:  # Only save if not already in database
                 PredictedCases.objects.update_or_create(
                     date=predicted_date,
-                    defaults={'predicted_cases': int(predicted_case)}
+                    defaults={
+                        'predicted_cases': int(predicted_case),
+                        'lower_cases': int(lower[i]),
+                        'upper_cases': int(upper[i]),
+                    }
                 )
+        transaction.on_commit(invalidate_table_versions)
         print("Future predictions saved to database.")
     else:
         print("Future predictions already exist in the database. No new predictions made.")
@@ -251,87 +630,10 @@ def visualize_predictions(predictions):
     Visualizes the predicted cases over time.
     :param predictions: List of predicted case numbers.
     """
+    import matplotlib.pyplot as plt
+
     plt.plot(predictions)
     plt.title("Predicted COVID-19 Cases")
     plt.xlabel("Days Ahead")
     plt.ylabel("Cases")
     plt.show()
-
-
-# from sklearn.metrics import mean_squared_error
-# def calculate_scaled_rmse_for_existing_dates():
-#     """
-#     Calculate RMSE in the scaled space for predicted cases against actual cases for existing dates in the dataset.
-#     This matches the error computation during training.
-#     :return: Scaled RMSE value
-#     """
-#     # Get predicted values
-#     predictions = predict_cases_for_existing_dates()
-#
-#     # Fetch actual values for the same dates
-#     actual_cases = list(CovidData.objects.filter(date__in=predictions.keys()).values_list('cases', flat=True))
-#     predicted_cases = list(predictions.values())
-#
-#     # Transform actual and predicted values to the scaled space
-#     scaled_actual = scaler.transform(pd.DataFrame(actual_cases, columns=["cases_new"]))
-#     scaled_predicted = scaler.transform(pd.DataFrame(predicted_cases, columns=["cases_new"]))
-#
-#     # Compute RMSE in the scaled space
-#     scaled_rmse = np.sqrt(mean_squared_error(scaled_actual, scaled_predicted))
-#
-#     print(f"Scaled RMSE: {scaled_rmse:.6f}")
-#     return scaled_rmse
-#
-# def evaluate_rmse_on_train_test_split():
-#     """
-#     Evaluate scaled RMSE separately for:
-#     - Training set (70% of original data).
-#     - Test set (30% of original data).
-#     """
-#     total_rows = 1716  # Total rows in the dataset during training
-#     train_rows = int(0.7 * total_rows)  # 70% training set
-#     test_rows = total_rows - train_rows  # 30% test set
-#
-#     # Training set evaluation
-#     train_scaled_cases = preprocess_data(window_size=train_rows)
-#     scaled_actual_train = train_scaled_cases[30:]
-#     rf_predictions_train = []
-#     lstm_predictions_train = []
-#
-#     for i in range(30, len(train_scaled_cases)):
-#         rf_input = train_scaled_cases[i-30:i].reshape(1, -1)
-#         rf_predictions_train.append(rf_model.predict(rf_input)[0])
-#
-#         lstm_input = np.hstack([
-#             train_scaled_cases[i-30:i].reshape(30, 1),
-#             np.full((30, 1), rf_predictions_train[-1])
-#         ]).reshape(1, 30, 2)
-#
-#         lstm_predictions_train.append(lstm_model.predict(lstm_input)[0][0])
-#
-#     scaled_rmse_train = np.sqrt(mean_squared_error(scaled_actual_train, lstm_predictions_train))
-#     print(f"Scaled RMSE on Training Set: {scaled_rmse_train:.6f}")
-#
-#     # Test set evaluation
-#     test_scaled_cases = preprocess_data(window_size=test_rows)
-#     scaled_actual_test = test_scaled_cases[30:]
-#     rf_predictions_test = []
-#     lstm_predictions_test = []
-#
-#     for i in range(30, len(test_scaled_cases)):
-#         rf_input = test_scaled_cases[i-30:i].reshape(1, -1)
-#         rf_predictions_test.append(rf_model.predict(rf_input)[0])
-#
-#         lstm_input = np.hstack([
-#             test_scaled_cases[i-30:i].reshape(30, 1),
-#             np.full((30, 1), rf_predictions_test[-1])
-#         ]).reshape(1, 30, 2)
-#
-#         lstm_predictions_test.append(lstm_model.predict(lstm_input)[0][0])
-#
-#     scaled_rmse_test = np.sqrt(mean_squared_error(scaled_actual_test, lstm_predictions_test))
-#     print(f"Scaled RMSE on Test Set: {scaled_rmse_test:.6f}")
-#
-#     return scaled_rmse_train, scaled_rmse_test
-
-
@@ -1,16 +1,59 @@
 from django.shortcuts import render
 
-from django.http import JsonResponse
-from api.models import CovidData
-from api.utils import preprocess_data, predict_with_hybrid_model
-from api.utils import get_all_predictions_from_db, get_all_current_from_db
+from api.models import CovidData, PredictedCases
+from api.series import (
+    PREDICTION_FIELDS, acombined_response, aseries_response, astate_predictions_response, astate_response,
+    asummary_response, combined_response, series_response, state_predictions_response, state_response,
+    summary_response,
+)
 
 
 def show_all_predictions(request):
-    predictions = get_all_predictions_from_db()
-    return JsonResponse({'predictions': predictions})
+    return series_response(request, PredictedCases.objects, 'predictions', PREDICTION_FIELDS)
 
 
 def show_all_current_cases(request):
-    current_cases = get_all_current_from_db()
-    return JsonResponse({'current_cases': current_cases})
+    return series_response(request, CovidData.objects, 'current_cases', ('date', 'cases'))
+
+
+def show_combined_cases(request):
+    return combined_response(request)
+
+
+def show_state_summary(request):
+    return state_response(request)
+
+
+def show_state_predictions(request):
+    return state_predictions_response(request)
+
+
+def show_summary(request):
+    return summary_response(request)
+
+
+# Async versions of the read endpoints, routed instead of the ones above when
+# API_ASYNC_VIEWS is set (ASGI deployments).
+
+async def ashow_all_predictions(request):
+    return await aseries_response(request, PredictedCases.objects, 'predictions', PREDICTION_FIELDS)
+
+
+async def ashow_all_current_cases(request):
+    return await aseries_response(request, CovidData.objects, 'current_cases', ('date', 'cases'))
+
+
+async def ashow_combined_cases(request):
+    return await acombined_response(request)
+
+
+async def ashow_state_summary(request):
+    return await astate_response(request)
+
+
+async def ashow_state_predictions(request):
+    return await astate_predictions_response(request)
+
+
+async def ashow_summary(request):
+    return await asummary_response(request)
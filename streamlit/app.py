@@ -1,11 +1,13 @@
 import streamlit as st
-import requests
 import pandas as pd
 import plotly.express as px  # For interactive graphs
 import plotly.graph_objects as go
 from streamlit_option_menu import option_menu
-import json
 from datetime import date
+# Cached API access shared by all sessions; set COVID_API_URL to change the backend URL
+from client import run_concurrently
+from data_access import get_combined_cases, load_state_summary, load_summary
+from geo import load_geojson
 
 
 # Configure the Streamlit page
@@ -16,9 +18,6 @@ st.set_page_config(
     initial_sidebar_state="auto"# Layout style ('centered' or 'wide')
 )
 
-# Base URL of your Django backend
-BASE_URL = "http://127.0.0.1:8000/"  # Update with your Django server URL
-
 # Inject custom CSS for styling
 st.markdown(
     """
@@ -72,89 +71,6 @@ st.markdown(
 )
 
 
-# Load COVID-19 data directly from the API
-@st.cache_data
-def load_data():
-    url = "https://raw.githubusercontent.com/MoH-Malaysia/covid19-public/refs/heads/main/epidemic/cases_state.csv"
-    covid_data = pd.read_csv(url)
-    covid_data['date'] = pd.to_datetime(covid_data['date'])
-    return covid_data
-
-# Load death cases data directly from the API
-@st.cache_data
-def load_death():
-    url = "https://raw.githubusercontent.com/MoH-Malaysia/covid19-public/refs/heads/main/epidemic/deaths_malaysia.csv"
-    death_data = pd.read_csv(url)
-    death_data['date'] = pd.to_datetime(death_data['date'])
-    return death_data
-
-
-# Combine Current Cases and Predicted Cases
-def get_combined_cases():
-    """
-    Combines current and predicted cases into a single DataFrame, aligning on date.
-    """
-    # Fetch current cases
-    response = requests.get(f"{BASE_URL}current_cases/")
-    if response.status_code == 200:
-        current_data = response.json().get('current_cases', [])
-
-    # Fetch predicted cases data from Django
-    response = requests.get(f"{BASE_URL}predict/")
-    if response.status_code == 200:
-        predicted_data = response.json().get('predictions', [])
-
-
-    if current_data and predicted_data:
-        # Create DataFrames from the fetched data
-        current_df = pd.DataFrame(current_data)  # Directly use the list
-        predicted_df = pd.DataFrame(predicted_data)  # Directly use the list
-
-        # # Debug data
-        # st.write("Current Data Preview:", current_df.head())
-        # st.write("Predicted Data Preview:", predicted_df.head())
-
-        # Ensure proper datetime format
-        current_df['date'] = pd.to_datetime(current_df['date'], errors='coerce')
-        predicted_df['date'] = pd.to_datetime(predicted_df['date'], errors='coerce')
-
-        # Rename columns for clarity
-        current_df = current_df.rename(columns={'cases': 'cases_current'})
-        predicted_df = predicted_df.rename(columns={'predicted_cases': 'cases_predicted'})
-
-        # Handle overlapping and future dates
-        # Create a full date range covering both current and predicted dates
-        all_dates = pd.date_range(
-            start=current_df['date'].min(),
-            end=predicted_df['date'].max()
-        )
-
-        # Reindex current and predicted data to the full date range
-        current_df = current_df.set_index('date').reindex(all_dates, fill_value=0).reset_index()
-        predicted_df = predicted_df.set_index('date').reindex(all_dates, fill_value=0).reset_index()
-
-        # Rename the reindexed column back to 'date'
-        current_df = current_df.rename(columns={'index': 'date'})
-        predicted_df = predicted_df.rename(columns={'index': 'date'})
-
-        # Merge datasets
-        combined_data = pd.merge(
-            current_df,
-            predicted_df,
-            on='date',
-            how='outer'
-        ).sort_values(by='date')
-
-        # # Debug combined data
-        # st.write("Combined DataFrame Preview:", combined_data.head())
-        # st.write("Combined DataFrame Preview:", combined_data.tail(10))
-        # st.write("Combined Data Columns:", combined_data.columns)
-
-        return combined_data
-    else:
-        return None
-
-
 # Initialize session state for navigation
 if "page" not in st.session_state:
     st.session_state.page = "Home"
@@ -207,12 +123,15 @@ if page == "Home":
     st.write("")
     st.write("")
     # fetch data
-    covid_data = load_data();
-    death_data = load_death();
-    # Aggregate totals
-    total_cases = covid_data['cases_new'].sum()
-    total_recovered = covid_data['cases_recovered'].sum()
-    total_death = death_data['deaths_new'].sum()
+    # Both requests run in parallel over the pooled client
+    summary, state_data = run_concurrently(load_summary, load_state_summary)
+    if summary is None or state_data is None:
+        st.error("Failed to fetch data from the backend.")
+        st.stop()
+    # Running totals maintained by the backend
+    total_cases = summary['total_cases']
+    total_recovered = summary['total_recovered']
+    total_death = summary['total_deaths']
 
     # Example (Replace with actual data fetched from the backend)
     st.markdown('<h2 style="color:#FF5733;">Malaysia COVID-19 Summary</h2>', unsafe_allow_html=True)
@@ -232,43 +151,12 @@ if page == "Home":
     st.write("")
 
 
-    # Load the GeoJSON file
-    with open("/Users/nursahirazhamri/Desktop/Covid19/streamlit/malaysia_state.geojson", "r") as f:
-        geojson_data = json.load(f)
-
-    geojson_states = [feature["properties"]["name"] for feature in geojson_data["features"]]
-    print("GeoJSON States:", geojson_states)
-
-    latest_date = covid_data['date'].max()
-    latest_data = covid_data[covid_data['date'] == latest_date]
-    map_data = latest_data[['state', 'cases_new']].rename(columns={"cases_new": "cases"})
-
-    api_states = map_data['state'].unique()
-    print("API States:", api_states)
-    # Check mismatches
-    mismatched_states = set(api_states) - set(geojson_states)
-    print("Mismatched States:", mismatched_states)
-
-    # Map state names if necessary (example for WP states)
-    state_mapping = {
-        "W.P. Kuala Lumpur": "Kuala Lumpur",
-        "W.P. Labuan": "Labuan",
-        "W.P. Putrajaya": "Putrajaya",
-        "Johor": "Johor",
-        "Kedah": "Kedah",
-        "Kelantan": "Kelantan",
-        "Melaka": "Melaka",
-        "Negeri Sembilan": "Negeri Sembilan",
-        "Pahang": "Pahang",
-        "Sabah": "Sabah",
-        "Sarawak": "Sarawak",
-        "Selangor": "Selangor",
-        "Terengganu": "Terengganu",
-        "Pulau Pinang": "Pulau Pinang",
-        "Perak": "Perak",
-        "Perlis": "Perlis",
-    }
-    map_data['state'] = map_data['state'].replace(state_mapping)
+    # Simplified state geometry with API state names, built once per process
+    geojson_data = load_geojson()
+
+    latest_date = state_data['latest_date'].max()
+    latest_data = state_data[state_data['latest_date'] == latest_date]
+    map_data = latest_data[['state', 'latest_cases']].rename(columns={"latest_cases": "cases"})
     formatted_date = latest_date.strftime("%d-%m-%Y")  # Format date as DD-MM-YYYY
 
 
@@ -276,8 +164,8 @@ if page == "Home":
     fig = px.choropleth(
         map_data,
         geojson=geojson_data,
-        locations="state",  # Match this column with GeoJSON properties.name
-        featureidkey="properties.name",  # GeoJSON key for state names
+        locations="state",  # Match this column with the GeoJSON feature ids
+        featureidkey="id",  # Feature ids are the API state names (see geo.py)
         color="cases",  # Column for coloring
         color_continuous_scale=["green", "yellow", "red"],  # Color gradient
     )
@@ -333,7 +221,7 @@ if page == "Home":
     # st.dataframe(map_data)
     # Sum cases for each state
     # Sum cases for each state
-    state_wise_cases = covid_data.groupby('state')['cases_new'].sum().reset_index()
+    state_wise_cases = state_data[['state', 'total_cases']].rename(columns={'total_cases': 'cases_new'})
 
     # Sort states by total cases (descending)
     state_wise_cases = state_wise_cases.sort_values(by='cases_new', ascending=False)
@@ -0,0 +1,67 @@
+"""
+HTTP client shared by the whole Streamlit process.
+
+One requests.Session keeps pooled keep-alive connections to the backend, so page loads
+reuse open connections instead of paying TCP setup per call. Every request has a connect
+and read timeout, and idempotent GETs are retried a bounded number of times with
+exponential backoff, so a slow or overloaded backend cannot hang a page.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Base URL of your Django backend
+BASE_URL = os.environ.get("COVID_API_URL", "http://127.0.0.1:8000/")
+
+# (connect, read) timeouts in seconds for every request
+TIMEOUT = (3.05, 10)
+
+# Retries after the first attempt, for connection errors and 502/503/504 responses.
+# With the backoff factor the waits are 0.25s and 0.5s, so a request gives up after
+# at most 3 attempts plus 0.75s of backoff.
+RETRIES = 2
+BACKOFF_FACTOR = 0.25
+
+# Connections kept open to the backend; also the number of concurrent fetches
+POOL_SIZE = 8
+
+
+def _make_session():
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False,  # Return the last response instead of raising
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# urllib3's connection pool is thread-safe, so sessions of all users share this one
+session = _make_session()
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix='api-client')
+
+
+def get(path, params=None, headers=None, timeout=TIMEOUT):
+    """
+    GET an endpoint of the backend over the pooled session.
+    :param path: Endpoint path relative to BASE_URL, e.g. 'combined/'.
+    :return: The requests.Response; raises requests.RequestException once retries are exhausted.
+    """
+    return session.get(f"{BASE_URL}{path}", params=params, headers=headers, timeout=timeout)
+
+
+def run_concurrently(*calls):
+    """
+    Run zero-argument callables (e.g. data loaders) in parallel on the client's thread pool.
+    :return: List of their results, in the order of the calls.
+    """
+    futures = [_executor.submit(call) for call in calls]
+    return [future.result() for future in futures]
@@ -0,0 +1,147 @@
+"""
+Data access for the Streamlit app.
+
+Responses of the Django API are cached once per process, so every session and every
+rerun shares them. Within the TTL a loader returns the cached frame without touching the
+network; after it the entry is revalidated with If-None-Match, and a 304 from the backend
+only refreshes the timestamp. Parsed frames are keyed on the backend's ETag, so they are
+rebuilt only when the data version changes.
+"""
+import threading
+import time
+
+import pandas as pd
+import requests
+
+import client
+
+# Seconds a cached response is served without revalidating; matches the API's max-age
+CACHE_TTL = 300
+
+
+class _Entry:
+    def __init__(self, etag, value):
+        self.etag = etag
+        self.value = value
+        self.checked_at = time.monotonic()
+
+    def is_fresh(self, ttl):
+        return time.monotonic() - self.checked_at < ttl
+
+
+_entries = {}
+_key_locks = {}
+_lock = threading.Lock()
+
+
+def _key_lock(key):
+    with _lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def fetch(path, params=None, parse=None, ttl=CACHE_TTL):
+    """
+    GET an API endpoint through the process-wide cache.
+    :param path: Endpoint path relative to client.BASE_URL, e.g. 'summary/'.
+    :param params: Query parameters.
+    :param parse: Function turning the decoded JSON into the cached value; runs once per data version.
+    :param ttl: Seconds the cached value is returned without a request.
+    :return: The parsed value, or None if the backend could not be reached and nothing is cached.
+    """
+    key = (path, tuple(sorted((params or {}).items())), parse)
+    entry = _entries.get(key)
+    if entry is not None and entry.is_fresh(ttl):
+        return entry.value
+
+    # One request per key at a time; sessions waiting on it reuse its result
+    with _key_lock(key):
+        entry = _entries.get(key)
+        if entry is not None and entry.is_fresh(ttl):
+            return entry.value
+
+        headers = {'If-None-Match': entry.etag} if entry is not None and entry.etag else {}
+        stale = entry.value if entry is not None else None
+        try:
+            response = client.get(path, params=params, headers=headers)
+        except requests.RequestException as e:
+            print(f"Failed to fetch {path}: {e}")
+            return stale
+
+        if response.status_code == 304 and entry is not None:
+            entry.checked_at = time.monotonic()
+            return entry.value
+        if response.status_code != 200:
+            print(f"Failed to fetch {path}: {response.status_code}")
+            return stale
+
+        body = response.json()
+        value = parse(body) if parse else body
+        _entries[key] = _Entry(response.headers.get('ETag'), value)
+        return value
+
+
+def clear():
+    """
+    Drop every cached response.
+    """
+    with _lock:
+        _entries.clear()
+
+
+def _summary(body):
+    return body.get('summary')
+
+
+def _states(body):
+    # Columnar layout: {'state': [...], 'total_cases': [...], 'latest_date': [...], ...}
+    states = body.get('states', {})
+    if not states.get('state'):
+        return None
+    state_data = pd.DataFrame(states)
+    state_data['latest_date'] = pd.to_datetime(state_data['latest_date'])
+    return state_data
+
+
+def _combined(body):
+    # Columnar layout: {'date': [...], 'actual': [...], 'predicted': [...]}
+    combined = body.get('combined', {})
+    if not combined.get('date'):
+        return None
+
+    combined_data = pd.DataFrame(combined)
+    combined_data['date'] = pd.to_datetime(combined_data['date'], errors='coerce')
+
+    # Dates missing from one of the series count as 0, like the old reindex did
+    combined_data = combined_data.rename(columns={'actual': 'cases_current', 'predicted': 'cases_predicted'})
+    combined_data[['cases_current', 'cases_predicted']] = (
+        combined_data[['cases_current', 'cases_predicted']].fillna(0).astype(int)
+    )
+    return combined_data
+
+
+def _copy(frame):
+    # Callers may modify the frame; the cached one is shared by every session
+    return None if frame is None else frame.copy()
+
+
+def load_summary():
+    """
+    Headline totals: {'total_cases': ..., 'total_deaths': ..., 'total_recovered': ...}.
+    """
+    summary = fetch('summary/', parse=_summary)
+    return dict(summary) if summary is not None else None
+
+
+def load_state_summary():
+    """
+    Per-state totals and latest-day cases as a DataFrame, one row per state.
+    """
+    return _copy(fetch('states/', {'format': 'columns'}, parse=_states))
+
+
+def get_combined_cases():
+    """
+    Current and predicted cases aligned on date as a DataFrame with
+    'date', 'cases_current' and 'cases_predicted' columns.
+    """
+    return _copy(fetch('combined/', {'format': 'columns'}, parse=_combined))
@@ -0,0 +1,120 @@
+"""
+Map geometry for the Home page choropleth.
+
+malaysia_state.geojson is read once per process, its polygons are simplified with the
+Douglas-Peucker algorithm and its state names are rewritten to the names used by the API
+(e.g. 'Kuala Lumpur' -> 'W.P. Kuala Lumpur'), so the map data can be matched without any
+per-rerun replacing and the browser receives far fewer vertices.
+"""
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+GEOJSON_PATH = Path(__file__).with_name("malaysia_state.geojson")
+
+# Simplification tolerance in degrees (~0.01 degrees is about 1 km); 0 keeps the full geometry
+SIMPLIFY_TOLERANCE = float(os.environ.get("COVID_MAP_TOLERANCE", "0.01"))
+
+# Decimal places kept in the coordinates sent to the browser
+COORDINATE_DECIMALS = 4
+
+# GeoJSON state name -> state name used by the API
+STATE_NAMES = {
+    "Kuala Lumpur": "W.P. Kuala Lumpur",
+    "Labuan": "W.P. Labuan",
+    "Putrajaya": "W.P. Putrajaya",
+}
+
+
+def simplify_line(points, tolerance):
+    """
+    Douglas-Peucker simplification of a polyline.
+    Uses an explicit stack, and each step measures the distance of all points of the current
+    span to its chord in one vectorised NumPy expression.
+    :param points: (n, 2) array of coordinates.
+    :param tolerance: Maximum distance of a dropped point from the simplified line.
+    :return: (m, 2) array with the kept points, always including both end points.
+    """
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    if n < 3 or tolerance <= 0:
+        return points
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        inner = points[first + 1:last]
+        chord = end - start
+        length = np.hypot(*chord)
+        if length == 0:
+            distances = np.hypot(*(inner - start).T)
+        else:
+            # Perpendicular distance through the 2-D cross product
+            distances = np.abs(chord[0] * (inner[:, 1] - start[1]) - chord[1] * (inner[:, 0] - start[0])) / length
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            split = first + 1 + index
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return points[keep]
+
+
+def simplify_ring(ring, tolerance):
+    """
+    Simplify a closed polygon ring, keeping it closed and valid (at least 4 positions).
+    Rings that would collapse are returned unchanged.
+    """
+    simplified = simplify_line(ring, tolerance)
+    if len(simplified) < 4:
+        return np.asarray(ring, dtype=float)
+    return simplified
+
+
+def _simplify_geometry(geometry, tolerance):
+    def polygon(rings):
+        return [np.round(simplify_ring(ring, tolerance), COORDINATE_DECIMALS).tolist() for ring in rings]
+
+    if geometry["type"] == "Polygon":
+        coordinates = polygon(geometry["coordinates"])
+    elif geometry["type"] == "MultiPolygon":
+        coordinates = [polygon(rings) for rings in geometry["coordinates"]]
+    else:
+        return geometry
+    return {"type": geometry["type"], "coordinates": coordinates}
+
+
+def preprocess_geojson(data, tolerance=SIMPLIFY_TOLERANCE):
+    """
+    Simplify every feature's geometry and normalize its name to the API's state name.
+    The name is also set as the feature id, which px.choropleth matches by default.
+    :return: New GeoJSON FeatureCollection dictionary.
+    """
+    features = []
+    for feature in data["features"]:
+        name = STATE_NAMES.get(feature["properties"]["name"], feature["properties"]["name"])
+        features.append({
+            "type": "Feature",
+            "id": name,
+            "properties": {"name": name},
+            "geometry": _simplify_geometry(feature["geometry"], tolerance),
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+@lru_cache(maxsize=None)
+def load_geojson(tolerance=SIMPLIFY_TOLERANCE):
+    """
+    Preprocessed state geometry, built once per process and tolerance.
+    The returned dictionary is shared; do not modify it.
+    """
+    with open(GEOJSON_PATH, "r") as f:
+        return preprocess_geojson(json.load(f), tolerance)
@@ -0,0 +1,137 @@
+"""
+Tests of the Streamlit data layer. The modules import each other by their bare names, like
+`streamlit run streamlit/app.py` does, so run them from this directory:
+
+    cd streamlit && python -m unittest tests
+"""
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+import requests
+
+import client
+import data_access
+import geo
+
+
+def make_response(status_code, body=None, etag=None):
+    response = mock.Mock(status_code=status_code, headers={'ETag': etag} if etag else {})
+    response.json.return_value = body
+    return response
+
+
+class FetchCacheTests(unittest.TestCase):
+    def setUp(self):
+        data_access.clear()
+        self.addCleanup(data_access.clear)
+
+    def expire(self, path):
+        # Age every cached entry of the path past the TTL
+        for key, entry in data_access._entries.items():
+            if key[0] == path:
+                entry.checked_at = time.monotonic() - data_access.CACHE_TTL - 1
+
+    def test_fresh_response_is_served_without_a_request(self):
+        with mock.patch('client.get', return_value=make_response(200, {'summary': 1}, '"v1"')) as get:
+            self.assertEqual(data_access.fetch('summary/'), {'summary': 1})
+            self.assertEqual(data_access.fetch('summary/'), {'summary': 1})
+        get.assert_called_once_with('summary/', params=None, headers={})
+
+    def test_stale_entry_is_revalidated_and_304_reuses_the_body(self):
+        parse = mock.Mock(side_effect=lambda body: body['summary'])
+        with mock.patch('client.get', return_value=make_response(200, {'summary': 1}, '"v1"')):
+            self.assertEqual(data_access.fetch('summary/', parse=parse), 1)
+
+        self.expire('summary/')
+        with mock.patch('client.get', return_value=make_response(304)) as get:
+            self.assertEqual(data_access.fetch('summary/', parse=parse), 1)
+            self.assertEqual(data_access.fetch('summary/', parse=parse), 1)  # Fresh again
+        get.assert_called_once_with('summary/', params=None, headers={'If-None-Match': '"v1"'})
+        parse.assert_called_once()
+
+    def test_request_error_falls_back_to_the_stale_copy(self):
+        with mock.patch('client.get', return_value=make_response(200, {'summary': 1}, '"v1"')):
+            data_access.fetch('summary/')
+
+        self.expire('summary/')
+        with mock.patch('client.get', side_effect=requests.ConnectionError('down')) as get:
+            self.assertEqual(data_access.fetch('summary/'), {'summary': 1})
+        get.assert_called_once()
+
+        with mock.patch('client.get', side_effect=requests.ConnectionError('down')):
+            self.assertIsNone(data_access.fetch('states/'))  # Nothing cached
+
+
+class GeoTests(unittest.TestCase):
+    # A thin closed diamond; its two side points are within 0.01 of the chord
+    RING = [[0.0, 0.0], [1.0, 0.001], [2.0, 0.0], [1.0, -0.001], [0.0, 0.0]]
+
+    def feature_collection(self):
+        square = [[101.0, 3.0], [101.5, 3.0001], [102.0, 3.0], [102.0, 4.0], [101.0, 4.0], [101.0, 3.0]]
+        return {'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'properties': {'name': 'Kuala Lumpur', 'code': 'KL'},
+             'geometry': {'type': 'Polygon', 'coordinates': [square]}},
+            {'type': 'Feature', 'properties': {'name': 'Johor'},
+             'geometry': {'type': 'MultiPolygon', 'coordinates': [[square]]}},
+        ]}
+
+    def test_straight_line_collapses_to_its_end_points(self):
+        line = np.column_stack([np.linspace(0, 1, 50), np.linspace(2, 3, 50)])
+        np.testing.assert_array_equal(geo.simplify_line(line, 0.01), [[0, 2], [1, 3]])
+
+    def test_ring_that_would_collapse_is_returned_unchanged(self):
+        ring = geo.simplify_ring(self.RING, 0.01)
+        np.testing.assert_array_equal(ring, self.RING)
+        np.testing.assert_array_equal(ring[0], ring[-1])
+
+    def test_names_are_normalized_to_the_api_state_names(self):
+        kuala_lumpur, johor = geo.preprocess_geojson(self.feature_collection(), tolerance=0.01)['features']
+        self.assertEqual(kuala_lumpur['id'], 'W.P. Kuala Lumpur')
+        self.assertEqual(kuala_lumpur['properties'], {'name': 'W.P. Kuala Lumpur'})
+        self.assertEqual(johor['id'], 'Johor')
+
+        # The near-collinear point of the bottom edge is dropped, the ring stays closed
+        ring = kuala_lumpur['geometry']['coordinates'][0]
+        self.assertEqual(ring, [[101.0, 3.0], [102.0, 3.0], [102.0, 4.0], [101.0, 4.0], [101.0, 3.0]])
+
+    def test_zero_tolerance_keeps_the_full_geometry(self):
+        data = self.feature_collection()
+        for original, feature in zip(data['features'], geo.preprocess_geojson(data, tolerance=0)['features']):
+            self.assertEqual(feature['geometry'], original['geometry'])
+
+
+class ClientTests(unittest.TestCase):
+    def test_session_retries_gets_with_backoff(self):
+        for scheme in ('http://', 'https://'):
+            retry = client.session.get_adapter(f'{scheme}backend/').max_retries
+            self.assertEqual(retry.total, client.RETRIES)
+            self.assertEqual(retry.backoff_factor, client.BACKOFF_FACTOR)
+            self.assertEqual(set(retry.status_forcelist), {502, 503, 504})
+            self.assertEqual(set(retry.allowed_methods), {'GET'})
+            self.assertFalse(retry.raise_on_status)
+
+    def test_run_concurrently_keeps_the_input_order(self):
+        def delayed(value, seconds):
+            def call():
+                time.sleep(seconds)
+                return value
+            return call
+
+        self.assertEqual(client.run_concurrently(delayed(1, 0.05), delayed(2, 0.02), delayed(3, 0)), [1, 2, 3])
+        self.assertEqual(client.run_concurrently(), [])
+
+    def test_run_concurrently_raises_the_first_failure(self):
+        def fail(message, seconds):
+            def call():
+                time.sleep(seconds)
+                raise ValueError(message)
+            return call
+
+        with self.assertRaisesRegex(ValueError, 'first'):
+            client.run_concurrently(lambda: 1, fail('first', 0.05), fail('second', 0))
+
+
+if __name__ == '__main__':
+    unittest.main()